@@ -1,19 +1,182 @@
-from django.contrib import admin
-from .models import StudentCode, LecturerCode, ManagerCode, Request, User, RequestImage, LocationUnit
+import json
 
-admin.site.register(StudentCode)
-admin.site.register(LecturerCode)
-admin.site.register(ManagerCode)
-admin.site.register(User)
-admin.site.register(RequestImage)
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ActionForm
+from django.core.paginator import Paginator
+from django.db import connections, transaction
+from django.db.models import F, Q
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from django.utils.functional import cached_property
+from core.services.notifications import render_request_approved_message, render_request_completed_message
+from core.services.request_counters import update_requests
+from core.services.request_status import can_set_done_q
+from .models import StudentCode, LecturerCode, ManagerCode, Request, User, RequestImage, LocationUnit, JobRun, EmailOutbox
 
-class RequestAdmin(admin.ModelAdmin):
-    list_display = ("id", "name", "status", "created_at", "updated_at")
 
-admin.site.register(Request, RequestAdmin)
+class EstimatedCountPaginator(Paginator):
+    """
+    На великих таблицях COUNT(*) читає всю таблицю або весь індекс.
+    Для PostgreSQL беремо оцінку планувальника (pg_class.reltuples без фільтрів,
+    EXPLAIN з фільтрами) і рахуємо точно лише тоді, коли рядків небагато.
+    """
+    estimate_threshold = 10000
+
+    @cached_property
+    def count(self):
+        estimate = estimate_count(self.object_list)
+        if estimate is None or estimate < self.estimate_threshold:
+            return super().count
+        return estimate
+
+
+def estimate_count(queryset):
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+
+    with connection.cursor() as cursor:
+        if not queryset.query.where:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+            # -1 — таблицю ще жодного разу не аналізували
+            return row[0] if row and row[0] >= 0 else None
+
+        sql, params = queryset.query.sql_with_params()
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
+
+
+class ScalableModelAdmin(admin.ModelAdmin):
+    paginator = EstimatedCountPaginator
+    # Без додаткового COUNT(*) по всій таблиці під час пошуку чи фільтрації
+    show_full_result_count = False
+
+
+@admin.register(StudentCode)
+class StudentCodeAdmin(ScalableModelAdmin):
+    list_display = ("code", "last_name", "first_name", "faculty", "group")
+    list_filter = ("faculty",)
+    search_fields = ("=code",)
+
+
+@admin.register(LecturerCode)
+class LecturerCodeAdmin(ScalableModelAdmin):
+    list_display = ("code", "last_name", "first_name", "job_position")
+    list_filter = ("job_position",)
+    search_fields = ("=code",)
+
+
+@admin.register(ManagerCode)
+class ManagerCodeAdmin(ScalableModelAdmin):
+    list_display = ("code", "last_name", "first_name", "job_position")
+    list_filter = ("job_position",)
+    search_fields = ("=code",)
+
+
+@admin.register(User)
+class UserAdmin(ScalableModelAdmin):
+    list_display = ("id", "email", "role", "is_active")
+    list_filter = ("role", "is_active")
+    search_fields = ("=email", "=registration_code")
+
+
+@admin.register(RequestImage)
+class RequestImageAdmin(ScalableModelAdmin):
+    list_display = ("id", "request_id", "image", "uploaded_at")
+    raw_id_fields = ("request",)
+
+
+class RequestActionForm(ActionForm):
+    # Причина для масової дії «Відхилено» — потрапляє в лист користувачу
+    rejection_comment = forms.CharField(label="Причина відхилення", required=False)
+
+
+@admin.register(Request)
+class RequestAdmin(ScalableModelAdmin):
+    list_display = ("id", "code", "name", "status", "type_request", "location_unit", "user", "created_at", "updated_at")
+    list_select_related = ("location_unit", "user")
+    list_filter = ("status", "type_request", "location_unit")
+    search_fields = ("=code", "=user__email")
+    raw_id_fields = ("user", "claimed_by", "possible_duplicate_of")
+    ordering = ("-id",)
+    actions = ["mark_approved", "mark_rejected", "mark_done", "release_claims"]
+    action_form = RequestActionForm
+
+    # Масові дії — один UPDATE на всі вибрані заявки, без завантаження об'єктів (лічильники — одним оновленням на групу).
+    # updated_at (auto_now) при .update() не оновлюється сам — задаємо явно для дельта-синхронізації.
+    def _bulk_update(self, request, queryset, **values):
+        updated = update_requests(queryset, updated_at=timezone.now(), **values)
+        self.message_user(request, f"Оновлено заявок: {updated}.", messages.SUCCESS)
+
+    def _bulk_transition(self, request, queryset, allowed, subject, render, **values):
+        """
+        Зміна статусу з тими ж правилами, що й в API: лише з дозволених станів,
+        з листом користувачу через EmailOutbox (надсилає send_outbox). Решту вибраних пропускаємо.
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            rows = list(
+                queryset.select_for_update(of=('self',)).filter(allowed)
+                .values_list('id', 'code', 'user__email')
+            )
+            updated = update_requests(
+                Request.objects.filter(id__in=[row[0] for row in rows]), updated_at=now, **values
+            ) if rows else 0
+            EmailOutbox.objects.bulk_create([
+                EmailOutbox(to_email=email, subject=subject, message=render(Request(code=code)))
+                for _, code, email in rows
+            ])
+
+        skipped = queryset.count() - updated
+        self.message_user(request, f"Оновлено заявок: {updated}.", messages.SUCCESS)
+        if skipped:
+            self.message_user(request, f"Пропущено заявок, для яких перехід недоступний: {skipped}.", messages.WARNING)
+
+    @admin.action(description="Позначити як «Підтверджено»")
+    def mark_approved(self, request, queryset):
+        self._bulk_transition(
+            request, queryset, Q(status='pending'), "Заявка схвалена", render_request_approved_message,
+            status='approved',
+        )
+
+    @admin.action(description="Позначити як «Відхилено»")
+    def mark_rejected(self, request, queryset):
+        reason = request.POST.get('rejection_comment', '').strip() or 'не вказана'
+        self._bulk_transition(
+            request, queryset, Q(status='pending'), "Заявку відхилено",
+            lambda obj: f"Заявку №{obj.code} відхилено.\nПричина: {reason}.",
+            status='rejected',
+        )
+
+    @admin.action(description="Позначити як «Виконано»")
+    def mark_done(self, request, queryset):
+        now = timezone.now()
+        self._bulk_transition(
+            request, queryset, Q(status='on_check') & can_set_done_q(now), "Заявка завершена",
+            lambda obj: render_request_completed_message(obj, manager_email=request.user.email),
+            status='done', completed_at=Coalesce(F('completed_at'), now),
+        )
+
+    @admin.action(description="Повернути в чергу (зняти резервування)")
+    def release_claims(self, request, queryset):
+        self._bulk_update(request, queryset, claimed_by=None, claim_expires_at=None)
+
 
 @admin.register(LocationUnit)
 class LocationUnitAdmin(admin.ModelAdmin):
     list_display = ("id", "name", "location_type", "street_name", "building_number", "is_active")
     list_filter = ("location_type", "is_active")
     search_fields = ("name", "street_name", "building_number")
+
+@admin.register(JobRun)
+class JobRunAdmin(ScalableModelAdmin):
+    list_display = ("job_name", "status", "started_at", "duration_ms", "hostname")
+    list_filter = ("job_name", "status")
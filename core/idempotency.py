@@ -0,0 +1,118 @@
+import hashlib
+import json
+import zlib
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import UploadedFile
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+HEADER = 'Idempotency-Key'
+MAX_KEY_LENGTH = 255
+
+
+def idempotent(handler):
+    """
+    Декоратор методу APIView (post/put): повтор запиту з тим самим заголовком Idempotency-Key
+    від того самого користувача на ту саму адресу отримує збережену першу відповідь —
+    без валідації, записів у БД і листів.
+    Паралельні дублікати серіалізуються блокуванням у кеші (cache.add): поки перший запит
+    виконується, повтори отримують 409 і можуть спробувати пізніше.
+    Зберігаються лише успішні (2xx) відповіді, стиснуті zlib, на IDEMPOTENCY_KEY_TTL секунд,
+    разом із відбитком тіла запиту: повтор ключа з іншим тілом отримує 422.
+    """
+    @wraps(handler)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if not key:
+            return handler(self, request, *args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return Response({"error": f"Заголовок {HEADER} задовгий."}, status=status.HTTP_400_BAD_REQUEST)
+
+        scope = f'{request.user.pk}:{request.method}:{request.path}:{key}'
+        cache_key = 'idempotency:' + hashlib.sha256(scope.encode()).hexdigest()
+        lock_key = cache_key + ':lock'
+        body_hash = _body_hash(request)
+
+        try:
+            stored = cache.get(cache_key)
+            if stored is not None:
+                return _replay(stored, body_hash)
+            locked = cache.add(lock_key, 1, settings.IDEMPOTENCY_LOCK_SECONDS)
+        except Exception:
+            # Кеш недоступний — обробляємо запит як звичайний
+            return handler(self, request, *args, **kwargs)
+
+        if not locked:
+            # Перший запит міг щойно завершитись
+            try:
+                stored = cache.get(cache_key)
+            except Exception:
+                stored = None
+            if stored is not None:
+                return _replay(stored, body_hash)
+            return Response(
+                {"error": f"Запит з цим {HEADER} ще виконується."},
+                status=status.HTTP_409_CONFLICT
+            )
+
+        try:
+            response = handler(self, request, *args, **kwargs)
+            if status.is_success(response.status_code):
+                try:
+                    cache.set(cache_key, _pack(response, body_hash), settings.IDEMPOTENCY_KEY_TTL)
+                except Exception:
+                    # Відповідь уже сформовано — без збереження повтор просто виконається ще раз
+                    pass
+            return response
+        finally:
+            try:
+                cache.delete(lock_key)
+            except Exception:
+                # Блокування саме зникне через IDEMPOTENCY_LOCK_SECONDS
+                pass
+
+    return wrapper
+
+
+def _body_hash(request):
+    """
+    Відбиток тіла запиту з розібраних даних: поля JSON/форми і вміст файлів
+    (файли читаються частинами — тіло multipart не копіюється в пам'ять ще раз).
+    """
+    digest = hashlib.sha256()
+    data = request.data
+    # QueryDict (форма, multipart) — усі значення кожного поля; JSON — одним значенням
+    items = sorted(data.lists()) if hasattr(data, 'lists') else [('', [data])]
+    for name, values in items:
+        digest.update(json.dumps(name).encode())
+        for value in values:
+            if isinstance(value, UploadedFile):
+                for chunk in value.chunks():
+                    digest.update(chunk)
+                value.seek(0)
+            else:
+                digest.update(json.dumps(value, cls=JSONEncoder, sort_keys=True, ensure_ascii=False).encode())
+    return digest.hexdigest()
+
+
+def _pack(response, body_hash):
+    # Дані відповіді в JSON (дати й Decimal — тим самим кодувальником, що й DRF), стиснуті zlib
+    payload = json.dumps([response.status_code, response.data, body_hash], cls=JSONEncoder, ensure_ascii=False)
+    return zlib.compress(payload.encode())
+
+
+def _replay(stored, body_hash):
+    # Записи, збережені до появи відбитка тіла, мають лише два елементи — їх не перевіряємо
+    status_code, data, *stored_hash = json.loads(zlib.decompress(stored))
+    if stored_hash and stored_hash[0] != body_hash:
+        return Response(
+            {"error": f"{HEADER} уже використано для запиту з іншим тілом."},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY
+        )
+    response = Response(data, status=status_code)
+    response['Idempotent-Replayed'] = 'true'
+    return response
@@ -0,0 +1,53 @@
+import time
+from types import SimpleNamespace
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+from core.models import Request, User
+from core.serializers import RequestDetailSerializer
+from core.services.request_projection import iter_request_rows
+
+
+class Command(BaseCommand):
+    help = 'Порівнює швидкість RequestDetailSerializer і швидкого шляху iter_request_rows (рядків за секунду)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--email', help='Користувач, від імені якого будується список (за замовчуванням — перший менеджер)')
+        parser.add_argument('--limit', type=int, default=2000)
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def handle(self, *args, **options):
+        if options['email']:
+            user = User.objects.filter(email=options['email']).first()
+        else:
+            user = User.objects.filter(role='manager').first()
+        if user is None:
+            raise CommandError('Користувача не знайдено.')
+
+        ids = list(Request.objects.order_by('id').values_list('id', flat=True)[:options['limit']])
+        queryset = Request.objects.filter(id__in=ids).order_by('id')
+        if not ids:
+            raise CommandError('У базі немає заявок.')
+
+        context = {'request': SimpleNamespace(user=user)}
+        renderer = JSONRenderer()
+
+        def serializer_path():
+            return renderer.render(RequestDetailSerializer(queryset, many=True, context=context).data)
+
+        def projection_path():
+            return renderer.render(list(iter_request_rows(queryset, user)))
+
+        if serializer_path() != projection_path():
+            raise CommandError('JSON відрізняється — швидкий шлях не відповідає серіалізатору.')
+
+        for label, func in (('RequestDetailSerializer', serializer_path), ('iter_request_rows', projection_path)):
+            best = min(self.measure(func) for _ in range(options['repeat']))
+            self.stdout.write(f'{label}: {len(ids) / best:,.0f} рядків/с ({best * 1000:.1f} мс на {len(ids)} рядків)')
+
+        self.stdout.write(self.style.SUCCESS('JSON обох шляхів ідентичний.'))
+
+    def measure(self, func):
+        started = time.perf_counter()
+        func()
+        return time.perf_counter() - started
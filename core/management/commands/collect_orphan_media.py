@@ -0,0 +1,113 @@
+import hashlib
+import os
+import shutil
+import time
+from array import array
+from bisect import bisect_left
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from core.models import RequestImage
+
+# Каталог медіа, у якому лежать фото заявок
+MEDIA_SUBDIR = 'requests'
+
+
+def path_key(name):
+    # 8-байтовий хеш шляху — множина на мільйони файлів займає десятки МБ, а не сотні
+    return int.from_bytes(hashlib.blake2b(name.encode(), digest_size=8).digest(), 'big')
+
+
+class CompactKeySet:
+    """
+    Множина 64-бітних ключів у 256 відсортованих масивах array('Q') — по 8 байтів на ключ.
+    Кожен масив сортується окремо, тож тимчасовий список займає лише 1/256 від усіх ключів.
+    """
+
+    def __init__(self, keys):
+        buckets = [array('Q') for _ in range(256)]
+        for key in keys:
+            buckets[key >> 56].append(key)
+        self.buckets = [array('Q', sorted(bucket)) for bucket in buckets]
+
+    def __contains__(self, key):
+        bucket = self.buckets[key >> 56]
+        index = bisect_left(bucket, key)
+        return index < len(bucket) and bucket[index] == key
+
+
+def load_referenced_keys(chunk_size=10000):
+    """
+    Потоково читає шляхи RequestImage.image з БД у компактну множину хешів.
+    Колізія хешів лише залишить зайвий файл, але ніколи не видалить потрібний.
+    """
+    names = RequestImage.objects.values_list('image', flat=True).iterator(chunk_size=chunk_size)
+    return CompactKeySet(path_key(name) for name in names)
+
+
+def iter_files(root, relative_to):
+    """
+    Генератор: обходить дерево каталогів через os.scandir без рекурсії,
+    повертаючи (відносний шлях, DirEntry) для кожного файлу.
+    """
+    stack = [root]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    yield os.path.relpath(entry.path, relative_to).replace(os.sep, '/'), entry
+
+
+class Command(BaseCommand):
+    help = 'Знаходить файли фото, на які немає посилань у БД, і видаляє або переносить їх у карантин'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--grace-hours', type=int, default=24,
+                            help='Не чіпати файли, новіші за цю кількість годин')
+        parser.add_argument('--delete', action='store_true', help='Видаляти знайдені файли')
+        parser.add_argument('--quarantine', help='Переносити знайдені файли в цей каталог')
+
+    def handle(self, *args, **options):
+        quarantine = options['quarantine']
+        delete = options['delete']
+        if delete and quarantine:
+            raise CommandError('Вкажіть або --delete, або --quarantine.')
+
+        media_root = os.path.abspath(settings.MEDIA_ROOT)
+        root = os.path.join(media_root, MEDIA_SUBDIR)
+        if quarantine and os.path.abspath(quarantine).startswith(root + os.sep):
+            raise CommandError('Каталог карантину не може бути всередині каталогу фото.')
+        if not os.path.isdir(root):
+            self.stdout.write('Каталог фото відсутній — нічого прибирати.')
+            return
+
+        # Межа визначається до читання БД: файли, завантажені після неї, не чіпаємо
+        threshold = time.time() - options['grace_hours'] * 3600
+        referenced = load_referenced_keys()
+
+        scanned = orphans = reclaimed = 0
+        for name, entry in iter_files(root, media_root):
+            scanned += 1
+            if path_key(name) in referenced:
+                continue
+
+            stat = entry.stat(follow_symlinks=False)
+            if stat.st_mtime > threshold:
+                continue
+
+            orphans += 1
+            reclaimed += stat.st_size
+
+            if delete:
+                os.remove(entry.path)
+            elif quarantine:
+                target = os.path.join(quarantine, name)
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                shutil.move(entry.path, target)
+
+        action = 'Видалено' if delete else 'Перенесено в карантин' if quarantine else 'Знайдено (без змін)'
+        self.stdout.write(self.style.SUCCESS(
+            f'Переглянуто {scanned} файлів. {action}: {orphans} файлів, {reclaimed} байтів ({reclaimed / (1024 * 1024):.1f} МБ).'
+        ))
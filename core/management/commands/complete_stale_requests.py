@@ -0,0 +1,67 @@
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from core.models import Request, EmailOutbox
+from core.services.notifications import render_request_auto_completed_message
+from core.services.request_status import can_set_done_q
+from core.services.request_counters import apply_counter_deltas
+
+
+class Command(BaseCommand):
+    help = 'Переводить у статус done усі заявки on_check, які можна завершити (див. can_set_done)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        total = 0
+
+        while True:
+            now = timezone.now()
+            with transaction.atomic():
+                # Рядки, заблоковані менеджером, що саме редагує заявку, пропускаємо
+                rows = list(
+                    Request.objects.select_for_update(skip_locked=True, of=('self',))
+                    .filter(status='on_check')
+                    .filter(can_set_done_q(now))
+                    .values_list('id', 'code', 'user__email', 'location_unit_id', 'type_request')[:batch_size]
+                )
+                if not rows:
+                    break
+
+                # Одним UPDATE для всієї партії
+                Request.objects.filter(id__in=[row[0] for row in rows]).update(
+                    status='done',
+                    completed_at=now,
+                    updated_at=now,
+                )
+
+                # Лічильники панелі менеджера: on_check -> done для кожної групи
+                moved = Counter((location_unit_id, type_request) for *_, location_unit_id, type_request in rows)
+                deltas = {}
+                for (location_unit_id, type_request), count in moved.items():
+                    deltas[(location_unit_id, type_request, 'on_check')] = -count
+                    deltas[(location_unit_id, type_request, 'done')] = count
+                apply_counter_deltas(deltas)
+
+                # Листи ставимо в чергу одним INSERT, надсилає їх send_outbox
+                EmailOutbox.objects.bulk_create([
+                    EmailOutbox(
+                        to_email=email,
+                        subject="Заявка завершена",
+                        message=render_request_auto_completed_message(
+                            Request(code=code), support_email=settings.SUPPORT_EMAIL
+                        ),
+                    )
+                    for _, code, email, *_ in rows
+                ])
+
+            total += len(rows)
+            if len(rows) < batch_size:
+                break
+
+        self.stdout.write(self.style.SUCCESS(f'Автоматично завершено {total} заявок.'))
@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand
+from core.models import RequestImage
+from core.services.images import compute_dhash
+
+
+class Command(BaseCommand):
+    help = 'Рахує перцептивні хеші (dHash) для фото, завантажених до появи пошуку схожих фото (можна перезапускати)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+
+        pending = RequestImage.objects.filter(phash__isnull=True).order_by('id')
+
+        last_id = 0
+        hashed = unreadable = 0
+
+        while True:
+            batch = list(pending.filter(id__gt=last_id).only('id', 'image')[:batch_size])
+            if not batch:
+                break
+
+            updated = []
+            for image in batch:
+                last_id = image.id
+                try:
+                    with image.image.open('rb') as f:
+                        phash = compute_dhash(f)
+                except FileNotFoundError:
+                    phash = None
+
+                if phash is None:
+                    # Файлу немає або він пошкоджений — хеш лишається порожнім
+                    unreadable += 1
+                    continue
+
+                image.set_phash(phash)
+                updated.append(image)
+
+            RequestImage.objects.bulk_update(
+                updated, ['phash', 'phash_band0', 'phash_band1', 'phash_band2', 'phash_band3']
+            )
+            hashed += len(updated)
+
+            self.stdout.write(f'Оброблено до id={last_id}: пораховано {hashed}, не прочитано {unreadable}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово. Пораховано {hashed} хешів, не вдалося прочитати {unreadable} файлів.'
+        ))
@@ -1,18 +1,44 @@
+from django.conf import settings
 from django.core.management.base import BaseCommand
-from core.models import Request
+from core.models import Request, RequestTombstone
+from core.services.request_sync import delete_requests
+from core.services.sla_report import month_start, store_months_before
 from django.utils import timezone
 from datetime import timedelta
 
 class Command(BaseCommand):
     help = 'Видаляє заявки зі статусом done, які старші за 30 днів'
 
-    def handle(self, *args, **kwargs):
-        threshold_date = timezone.now() - timedelta(days=30)
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=30, help='Скільки днів щонайменше зберігати виконані заявки (видаляються цілими місяцями)')
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Скільки заявок видаляти за одну транзакцію')
+
+    def handle(self, *args, **options):
+        days = options['days']
+        batch_size = options['batch_size']
+
+        # Видаляємо лише цілі місяці: межа — початок місяця, в який потрапляє (зараз - days).
+        # Тож збережений звіт SLA за місяць ніколи не доведеться перераховувати з неповних даних.
+        threshold_date = month_start(timezone.now() - timedelta(days=days))
         old_requests = Request.objects.filter(status='done',  completed_at__lt=threshold_date)
 
-        count = old_requests.count()
-        old_requests.delete()
+        # Звіт SLA за ці місяці — до видалення, поки дані ще є
+        store_months_before(threshold_date)
+
+        # Надгробки потрібні клієнтам для дельта-синхронізації
+        count = delete_requests(old_requests, batch_size=batch_size)
+
+        # Старі надгробки більше не потрібні: клієнти з таким давнім курсором синхронізуються повністю
+        old_tombstones = RequestTombstone.objects.filter(
+            deleted_at__lt=timezone.now() - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+        )
+        while True:
+            batch = list(old_tombstones.values_list('id', flat=True)[:batch_size])
+            if not batch:
+                break
+            RequestTombstone.objects.filter(id__in=batch).delete()
 
         self.stdout.write(self.style.SUCCESS(
-            f'Видалено {count} заявок зі статусом "done", старших за 30 днів.'
+            f'Видалено {count} заявок зі статусом "done", старших за {days} днів.'
         ))
@@ -0,0 +1,63 @@
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db.models import Exists, OuterRef
+from core.models import User, StudentCode, LecturerCode, ManagerCode
+
+# Джерела кодів та ролі, які вони дають
+CODE_SOURCES = [
+    (StudentCode, 'student'),
+    (LecturerCode, 'lecturer'),
+    (ManagerCode, 'manager'),
+]
+
+
+class Command(BaseCommand):
+    help = 'Масово створює неактивні акаунти з реєстраційних кодів (без пароля, партіями через bulk_create)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--domain', default='provisioned.invalid',
+                            help='Домен службових email до завершення реєстрації')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        domain = options['domain']
+        total = 0
+
+        for code_model, role in CODE_SOURCES:
+            # Коди, для яких акаунт ще не існує. Старі акаунти (до registration_code), які міграція
+            # не змогла однозначно прив'язати, впізнаємо за роллю та ПІБ — такі коди не чіпаємо.
+            legacy = User.objects.filter(
+                registration_code__isnull=True, role=role,
+                last_name=OuterRef('last_name'), first_name=OuterRef('first_name'), patronymic=OuterRef('patronymic'),
+            )
+            codes = code_model.objects.exclude(
+                code__in=User.objects.filter(registration_code__isnull=False).values('registration_code')
+            ).exclude(Exists(legacy)).values_list('code', 'first_name', 'last_name', 'patronymic')
+
+            batch = []
+            for code, first_name, last_name, patronymic in codes.iterator(chunk_size=batch_size):
+                batch.append(User(
+                    email=f'{code}@{domain}'.lower(),
+                    registration_code=code,
+                    role=role,
+                    first_name=first_name,
+                    last_name=last_name,
+                    patronymic=patronymic,
+                    is_active=False,  # активується під час реєстрації
+                    is_staff=role == 'manager',
+                    password=make_password(None),  # непридатний пароль — без хешування
+                ))
+                if len(batch) >= batch_size:
+                    total += self.flush(batch)
+                    batch = []
+
+            if batch:
+                total += self.flush(batch)
+
+        self.stdout.write(self.style.SUCCESS(f'Оброблено {total} кодів без акаунта.'))
+
+    def flush(self, batch):
+        # ignore_conflicts — паралельна реєстрація з тим самим кодом не зупинить команду
+        User.objects.bulk_create(batch, ignore_conflicts=True)
+        return len(batch)
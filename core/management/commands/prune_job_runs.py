@@ -0,0 +1,31 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from core.models import JobRun
+
+
+class Command(BaseCommand):
+    help = 'Видаляє старі записи журналу запусків планувальника (JobRun)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None,
+                            help='Скільки днів зберігати журнал (типово JOB_RUN_RETENTION_DAYS)')
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Скільки записів видаляти за одну транзакцію')
+
+    def handle(self, *args, **options):
+        days = options['days'] if options['days'] is not None else settings.JOB_RUN_RETENTION_DAYS
+        batch_size = options['batch_size']
+
+        old_runs = JobRun.objects.filter(started_at__lt=timezone.now() - timedelta(days=days))
+        count = 0
+        while True:
+            batch = list(old_runs.values_list('id', flat=True)[:batch_size])
+            if not batch:
+                break
+            JobRun.objects.filter(id__in=batch).delete()
+            count += len(batch)
+
+        self.stdout.write(self.style.SUCCESS(f'Видалено {count} записів JobRun, старших за {days} днів.'))
@@ -0,0 +1,27 @@
+import os
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from core.models import UploadSession
+
+
+class Command(BaseCommand):
+    help = 'Видаляє незавершені сесії докачуваного завантаження та їхні тимчасові файли'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, default=24, help='Вік сесії, після якого вона вважається покинутою')
+
+    def handle(self, *args, **options):
+        stale = UploadSession.objects.filter(created_at__lt=timezone.now() - timedelta(hours=options['hours']))
+
+        count = 0
+        for session in stale.iterator():
+            try:
+                os.remove(session.temp_path)
+            except FileNotFoundError:
+                pass
+            session.delete()
+            count += 1
+
+        self.stdout.write(self.style.SUCCESS(f'Видалено {count} покинутих сесій завантаження.'))
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from core.services.request_counters import rebuild_counters
+
+
+class Command(BaseCommand):
+    help = 'Перераховує лічильники заявок для панелі менеджера з таблиці заявок'
+
+    def handle(self, *args, **options):
+        count = rebuild_counters()
+        self.stdout.write(self.style.SUCCESS(f'Лічильники перераховано: {count} груп.'))
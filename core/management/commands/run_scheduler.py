@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from core.services.scheduler import run_due_jobs
+from repair_requests.db_router import pin_to_primary
+
+
+class Command(BaseCommand):
+    help = 'Запускає вбудований планувальник періодичних задач (один виконавець на кластер через advisory lock)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tick', type=int, default=30, help='Інтервал перевірки в секундах')
+        parser.add_argument('--once', action='store_true', help='Виконати один тік і завершитись (для cron)')
+
+    def handle(self, *args, **options):
+        # Розклад і журнал читаємо лише з основної БД — репліка може відставати
+        pin_to_primary()
+
+        while True:
+            for run in run_due_jobs():
+                style = self.style.SUCCESS if run.status == 'success' else self.style.ERROR
+                self.stdout.write(style(f'{run.job_name}: {run.status} за {run.duration_ms} мс'))
+
+            if options['once']:
+                break
+
+            close_old_connections()
+            time.sleep(options['tick'])
@@ -0,0 +1,78 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from core.models import Request, User
+from repair_requests.db_router import pin_to_primary
+from core.services.notifications import render_new_request_message, render_manager_digest_message
+
+# Як часто надсилати повідомлення для кожного режиму
+MODE_INTERVALS = {
+    'immediate': timedelta(0),
+    'hourly': timedelta(hours=1),
+    'daily': timedelta(days=1),
+}
+
+
+class Command(BaseCommand):
+    help = 'Надсилає менеджерам повідомлення про нові заявки: одразу або дайджестом, через одне SMTP-зʼєднання'
+
+    def handle(self, *args, **options):
+        # Курсор зсувається по submitted_at, тож читати треба з основної БД, а не з репліки, що відстає
+        pin_to_primary()
+
+        now = timezone.now()
+        # submitted_at ставиться до фіксації транзакції: заявка, відправлена трохи раніше за now,
+        # може стати видимою вже після цього запиту. Тому беремо й зсуваємо курсор лише до now - lag,
+        # як і дельта-синхронізація (SYNC_LAG_SECONDS).
+        horizon = now - timedelta(seconds=settings.SYNC_LAG_SECONDS)
+        managers = list(
+            User.objects.filter(role='manager', is_active=True)
+            .values('id', 'email', 'notification_mode', 'notifications_sent_until')
+        )
+
+        # Нові менеджери починають отримувати повідомлення з поточного моменту
+        fresh_ids = [m['id'] for m in managers if m['notifications_sent_until'] is None]
+        due = [
+            m for m in managers
+            if m['notifications_sent_until'] is not None
+            and m['notifications_sent_until'] + MODE_INTERVALS[m['notification_mode']] <= now
+        ]
+
+        messages = []
+        if due:
+            # Один запит на всі заявки, відправлені з найстарішого курсора
+            since = min(m['notifications_sent_until'] for m in due)
+            rows = list(
+                Request.objects.filter(submitted_at__gt=since, submitted_at__lte=horizon)
+                .order_by('submitted_at')
+                .values('code', 'name', 'submitted_at')
+            )
+
+            for manager in due:
+                new_rows = [row for row in rows if row['submitted_at'] > manager['notifications_sent_until']]
+                if not new_rows:
+                    continue
+
+                if manager['notification_mode'] == 'immediate':
+                    messages += [
+                        EmailMessage("Нова заявка на перевірку", render_new_request_message(row),
+                                     settings.DEFAULT_FROM_EMAIL, [manager['email']])
+                        for row in new_rows
+                    ]
+                else:
+                    messages.append(
+                        EmailMessage("Дайджест нових заявок", render_manager_digest_message(new_rows),
+                                     settings.DEFAULT_FROM_EMAIL, [manager['email']])
+                    )
+
+        if messages:
+            with get_connection() as connection:
+                connection.send_messages(messages)
+
+        # Курсори зсуваються лише після успішного надсилання
+        User.objects.filter(id__in=fresh_ids + [m['id'] for m in due]).update(notifications_sent_until=horizon)
+
+        self.stdout.write(self.style.SUCCESS(f'Надіслано {len(messages)} листів менеджерам.'))
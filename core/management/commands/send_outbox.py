@@ -0,0 +1,41 @@
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from core.models import EmailOutbox
+
+
+class Command(BaseCommand):
+    help = 'Надсилає листи з черги EmailOutbox партіями через одне SMTP-зʼєднання'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        total = 0
+
+        with get_connection() as connection:
+            while True:
+                with transaction.atomic():
+                    # skip_locked — кілька процесів не надішлють той самий лист двічі
+                    batch = list(
+                        EmailOutbox.objects.select_for_update(skip_locked=True)
+                        .filter(sent_at__isnull=True)
+                        .order_by('id')[:batch_size]
+                    )
+                    if not batch:
+                        break
+
+                    connection.send_messages([
+                        EmailMessage(item.subject, item.message, settings.DEFAULT_FROM_EMAIL, [item.to_email])
+                        for item in batch
+                    ])
+                    EmailOutbox.objects.filter(id__in=[item.id for item in batch]).update(sent_at=timezone.now())
+
+                total += len(batch)
+                if len(batch) < batch_size:
+                    break
+
+        self.stdout.write(self.style.SUCCESS(f'Надіслано {total} листів із черги.'))
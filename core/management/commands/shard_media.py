@@ -0,0 +1,56 @@
+import os
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from core.models import RequestImage, sharded_image_path
+
+
+class Command(BaseCommand):
+    help = 'Переносить фото заявок з плаского каталогу requests/ у структуру за датою та хешем (можна перезапускати)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--dry-run', action='store_true', help='Лише порахувати, нічого не переносити')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        dry_run = options['dry_run']
+
+        # Файли, що ще лежать у старому пласкому каталозі
+        flat_images = RequestImage.objects.filter(image__regex=r'^requests/[^/]+$').order_by('id')
+
+        last_id = 0
+        moved = missing = 0
+
+        while True:
+            batch = list(
+                flat_images.filter(id__gt=last_id).values_list('id', 'image', 'uploaded_at')[:batch_size]
+            )
+            if not batch:
+                break
+
+            for pk, name, uploaded_at in batch:
+                last_id = pk
+                new_name = sharded_image_path(os.path.basename(name), uploaded_at)
+                old_path = default_storage.path(name)
+                new_path = default_storage.path(new_name)
+
+                if os.path.exists(old_path):
+                    if not dry_run:
+                        os.makedirs(os.path.dirname(new_path), exist_ok=True)
+                        os.replace(old_path, new_path)
+                elif not os.path.exists(new_path):
+                    # Файлу немає ні на старому, ні на новому місці
+                    missing += 1
+                    continue
+                # Якщо файл уже на новому місці (попередній запуск перервався) — лише оновлюємо запис
+
+                if not dry_run:
+                    RequestImage.objects.filter(pk=pk, image=name).update(image=new_name)
+                moved += 1
+
+            self.stdout.write(f'Оброблено до id={last_id}: перенесено {moved}, відсутніх файлів {missing}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово. Перенесено {moved} файлів, відсутніх файлів {missing}.'
+        ))
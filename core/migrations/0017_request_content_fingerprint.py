@@ -0,0 +1,56 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from core.services.fingerprints import compute_fingerprint, compute_simhash
+
+
+def fill_fingerprints(apps, schema_editor):
+    Request = apps.get_model('core', 'Request')
+    batch = []
+    for request in Request.objects.only('id', 'name', 'description', 'location_unit_id', 'room_number').iterator(chunk_size=1000):
+        request.content_fingerprint = compute_fingerprint(
+            request.name, request.description, request.location_unit_id, request.room_number
+        )
+        request.content_simhash = compute_simhash(f"{request.name} {request.description}")
+        batch.append(request)
+        if len(batch) >= 1000:
+            Request.objects.bulk_update(batch, ['content_fingerprint', 'content_simhash'])
+            batch = []
+    if batch:
+        Request.objects.bulk_update(batch, ['content_fingerprint', 'content_simhash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_alter_request_room_number'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='request',
+            name='content_fingerprint',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='request',
+            name='content_simhash',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='request',
+            name='possible_duplicate_of',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='core.request'),
+        ),
+        migrations.RunPython(fill_fingerprints, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='request',
+            index=models.Index(fields=['user', 'content_fingerprint'], name='request_user_fprint_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='request',
+            index=models.Index(fields=['location_unit', 'room_number'], name='request_unit_room_idx'),
+        ),
+    ]
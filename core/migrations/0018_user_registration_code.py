@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_request_content_fingerprint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='registration_code',
+            field=models.CharField(blank=True, max_length=20, null=True, unique=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0018_user_registration_code'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='requestimage',
+            name='image',
+            field=models.ImageField(db_index=True, upload_to='requests/'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:44
+
+import core.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0019_requestimage_image_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='requestimage',
+            name='image',
+            field=models.ImageField(db_index=True, upload_to=core.models.request_image_upload_to),
+        ),
+    ]
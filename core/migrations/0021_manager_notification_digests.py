@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0020_requestimage_sharded_upload_to'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='request',
+            name='submitted_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='notification_mode',
+            field=models.CharField(choices=[('immediate', 'Одразу'), ('hourly', 'Щогодинний дайджест'), ('daily', 'Щоденний дайджест')], default='immediate', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='notifications_sent_until',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
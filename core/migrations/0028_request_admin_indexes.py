@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0027_requestimage_phash'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='request',
+            name='code',
+            field=models.CharField(blank=True, db_index=True, max_length=4, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='request',
+            index=models.Index(fields=['status', '-id'], name='request_status_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='request',
+            index=models.Index(fields=['type_request', '-id'], name='request_type_id_idx'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_counters(apps, schema_editor):
+    Request = apps.get_model('core', 'Request')
+    RequestCounter = apps.get_model('core', 'RequestCounter')
+    rows = Request.objects.values('location_unit_id', 'type_request', 'status').annotate(count=Count('id')).order_by()
+    RequestCounter.objects.bulk_create([RequestCounter(**row) for row in rows])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0030_request_status_updated_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RequestCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('type_request', models.CharField(choices=[('electrical_appliances', 'Електроприлади'), ('electricity', 'Електрика'), ('plumbing', 'Сантехніка'), ('heating', 'Опалення'), ('ventilation', 'Вентиляція'), ('internet', 'Інтернет'), ('furniture', 'Меблі'), ('windows_doors', 'Вікна / Двері'), ('other', 'Інше')], max_length=50)),
+                ('status', models.CharField(choices=[('pending', 'В обробці'), ('approved', 'Підтверджено'), ('rejected', 'Відхилено'), ('done', 'Виконано'), ('on_check', 'В роботі'), ('empty', 'Чернетка')], max_length=50)),
+                ('count', models.IntegerField(default=0)),
+                ('location_unit', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.locationunit')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('location_unit', 'type_request', 'status'), name='request_counter_unique')],
+            },
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
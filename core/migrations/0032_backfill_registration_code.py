@@ -0,0 +1,51 @@
+from django.db import migrations
+
+# Джерела кодів та ролі, які вони дають (як у provision_accounts)
+CODE_SOURCES = [
+    ('StudentCode', 'student'),
+    ('LecturerCode', 'lecturer'),
+    ('ManagerCode', 'manager'),
+]
+
+
+def backfill_registration_code(apps, schema_editor):
+    """
+    Акаунти, створені до 0018, не мають registration_code. Прив'язуємо код лише там,
+    де збіг однозначний: рівно один код цієї ролі з таким ПІБ і рівно один такий акаунт.
+    Решту залишаємо — їх коди вважаються використаними за збігом ПІБ (див. RegisterSerializer).
+    """
+    User = apps.get_model('core', 'User')
+    for model_name, role in CODE_SOURCES:
+        code_model = apps.get_model('core', model_name)
+        codes = {}
+        for code, *name in code_model.objects.values_list('code', 'last_name', 'first_name', 'patronymic'):
+            codes.setdefault(tuple(name), []).append(code)
+
+        users = {}
+        legacy = User.objects.filter(role=role, registration_code__isnull=True, is_superuser=False)
+        for pk, *name in legacy.values_list('pk', 'last_name', 'first_name', 'patronymic'):
+            users.setdefault(tuple(name), []).append(pk)
+
+        for name, pks in users.items():
+            matched = codes.get(name, [])
+            if len(pks) != 1 or len(matched) != 1:
+                continue
+            code = matched[0]
+            holder = User.objects.filter(registration_code=code).first()
+            if holder is not None:
+                # Дублікат від provision_accounts, яким ще ніхто не входив, — прибираємо
+                if holder.is_active or holder.last_login is not None:
+                    continue
+                holder.delete()
+            User.objects.filter(pk=pks[0]).update(registration_code=code)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0031_requestcounter'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_registration_code, migrations.RunPython.noop),
+    ]
@@ -1,11 +1,18 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import AbstractUser
 from django.contrib.auth.base_user import BaseUserManager
 from django.conf import settings
+import hashlib
+import os
 import random
+import uuid
 from django.utils import timezone
 from datetime import timedelta
 
+from core.services.fingerprints import compute_fingerprint, compute_simhash, phash_bands, PHASH_BANDS
+from core.services.images import compute_dhash
+from core.services.request_counters import COUNTER_FIELDS, apply_counter_deltas, counter_key
+
 
 # Менеджер користувачів для кастомної моделі User
 class CustomUserManager(BaseUserManager):
@@ -55,6 +62,18 @@ class User(AbstractUser):
     ]
     role = models.CharField(max_length=20, choices=ROLE_CHOICES)
 
+    # Реєстраційний код (StudentCode / LecturerCode / ManagerCode), з яким створено акаунт
+    registration_code = models.CharField(max_length=20, unique=True, blank=True, null=True)
+
+    # Як менеджер отримує повідомлення про нові заявки
+    NOTIFICATION_MODE_CHOICES = [
+        ('immediate', 'Одразу'),
+        ('hourly', 'Щогодинний дайджест'),
+        ('daily', 'Щоденний дайджест'),
+    ]
+    notification_mode = models.CharField(max_length=20, choices=NOTIFICATION_MODE_CHOICES, default='immediate')
+    notifications_sent_until = models.DateTimeField(blank=True, null=True)  # До якого моменту заявки вже надіслано
+
     # Вказуємо свій менеджер
     objects = CustomUserManager()
 
@@ -102,7 +121,7 @@ class Request(models.Model):
     entrance_number = models.CharField(max_length=10, blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)  # Дата створення
     status = models.CharField(max_length=50, choices=STATUS_CHOICES, default='empty')# Статус
-    code = models.CharField(max_length=4, blank=True, null=True)
+    code = models.CharField(max_length=4, blank=True, null=True, db_index=True)
     assigned_master_name = models.CharField(max_length=100, blank=True, null=True)
     assigned_master_company = models.CharField(max_length=100, blank=True, null=True)
     assigned_master_phone = models.CharField(max_length=20, blank=True, null=True)
@@ -111,14 +130,70 @@ class Request(models.Model):
     user_confirmed = models.BooleanField(default=False)
     manager_confirmed = models.BooleanField(default=False)
     completed_at = models.DateTimeField(blank=True, null=True)
+    submitted_at = models.DateTimeField(blank=True, null=True, db_index=True)  # Коли відправлено на перевірку
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Нормалізований відбиток вмісту (точні дублікати) та SimHash опису (схожі заявки)
+    content_fingerprint = models.CharField(max_length=64, blank=True, default='')
+    content_simhash = models.BigIntegerField(blank=True, null=True)
+    possible_duplicate_of = models.ForeignKey(
+        'self',
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        related_name='+'
+    )  # Найсхожіша активна заявка в тій самій кімнаті
+
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
         related_name='requests'
     )  # Хто створив заявку
 
+    # Менеджер, який узяв заявку в роботу з черги, і до коли діє це резервування
+    claimed_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        related_name='claimed_requests'
+    )
+    claim_expires_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'content_fingerprint'], name='request_user_fprint_idx'),
+            models.Index(fields=['location_unit', 'room_number'], name='request_unit_room_idx'),
+            # Часткий індекс для автоматичного завершення заявок у статусі on_check
+            models.Index(
+                fields=['status', 'work_date'],
+                name='request_oncheck_workdate_idx',
+                condition=models.Q(status='on_check'),
+            ),
+            # Черга менеджерів: найстаріші заявки в статусі pending
+            models.Index(
+                fields=['created_at'],
+                name='request_pending_queue_idx',
+                condition=models.Q(status='pending'),
+            ),
+            # Дельта-синхронізація: зміни після курсора (updated_at, id)
+            models.Index(fields=['updated_at', 'id'], name='request_updated_sync_idx'),
+            # Очищення старих виконаних заявок (delete_old_requests)
+            models.Index(
+                fields=['completed_at'],
+                name='request_done_completed_idx',
+                condition=models.Q(status='done'),
+            ),
+            # Звіт SLA: заявки, що довго не змінювали статус
+            models.Index(fields=['status', 'updated_at'], name='request_status_updated_idx'),
+            # Фільтри адмінки за статусом і типом із сортуванням за id
+            models.Index(fields=['status', '-id'], name='request_status_id_idx'),
+            models.Index(fields=['type_request', '-id'], name='request_type_id_idx'),
+        ]
+
+    # Ключ лічильника (локація, тип, статус), з яким заявка збережена в БД; None — ще не збережена
+    _counter_key = None
+
     def save(self, *args, **kwargs):
         if not self.code:
             while True:
@@ -127,11 +202,55 @@ class Request(models.Model):
                     self.code = generated_code
                     break
 
+        # Оновлюємо відбитки вмісту
+        self.content_fingerprint = compute_fingerprint(
+            self.name, self.description, self.location_unit_id, self.room_number
+        )
+        self.content_simhash = compute_simhash(f"{self.name} {self.description}")
+
         # Перевірка переходу в статус "done" (або "completed" — залежить від поля)
         if self.status == 'done' and self.completed_at is None:
             self.completed_at = timezone.now()
 
-        super().save(*args, **kwargs)
+        # Лічильники для панелі менеджера оновлюються в тій самій транзакції, що й заявка
+        update_fields = kwargs.get('update_fields')
+        counted = update_fields is None or any(
+            field in update_fields for field in ('location_unit', *COUNTER_FIELDS)
+        )
+        with transaction.atomic():
+            if counted and not self._state.adding and self._counter_key is None:
+                # Заявку завантажено без полів лічильника (.only/.defer) — беремо старий стан з БД
+                self._counter_key = Request.objects.filter(pk=self.pk).values_list(*COUNTER_FIELDS).first()
+
+            old_status = None
+            if counted and self._counter_key is not None:
+                old_status = dict(zip(COUNTER_FIELDS, self._counter_key))['status']
+            if old_status == 'done' and self.status != 'done' and self.completed_at is not None:
+                # Заявку відновлено: збережений звіт SLA за місяць завершення більше не точний,
+                # а повторне завершення рахується вже в місяці нового completed_at
+                SlaMonthReport.invalidate(self.completed_at)
+                self.completed_at = None
+                if update_fields is not None:
+                    kwargs['update_fields'] = {*update_fields, 'completed_at'}
+
+            super().save(*args, **kwargs)
+
+            if counted:
+                old_key, new_key = self._counter_key, counter_key(self)
+                if old_key != new_key:
+                    deltas = {new_key: 1}
+                    if old_key is not None:
+                        deltas[old_key] = -1
+                    apply_counter_deltas(deltas)
+                self._counter_key = new_key
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Стан, з якого заявка завантажена, — щоб при збереженні знати, який лічильник зменшити
+        if all(field in field_names for field in COUNTER_FIELDS):
+            instance._counter_key = counter_key(instance)
+        return instance
 
     def __str__(self):
         return f"{self.name} ({self.get_type_request_display()}) - {self.status}"
@@ -236,13 +355,59 @@ class ManagerCode(models.Model):
         # Відображення у списку моделей (наприклад, у Django Admin)
         return f"{self.code} — {self.last_name} {self.first_name}"
 
+def sharded_image_path(filename, date):
+    """
+    Шлях у розбитій на каталоги структурі: requests/<рік>/<місяць>/<2 hex хешу імені>/<ім'я>.
+    Шлях детермінований, тож перенесення старих файлів можна безпечно повторювати.
+    """
+    shard = hashlib.md5(filename.encode()).hexdigest()[:2]
+    return f"requests/{date:%Y/%m}/{shard}/{filename}"
+
+
+def request_image_upload_to(instance, filename):
+    # Унікальне ім'я з оригінальним розширенням
+    ext = os.path.splitext(filename)[1].lower()
+    return sharded_image_path(f"{uuid.uuid4().hex}{ext}", timezone.now())
+
+
 class RequestImage(models.Model):
     request = models.ForeignKey('Request', on_delete=models.CASCADE, related_name='images')
-    image = models.ImageField(upload_to='requests/')
+    image = models.ImageField(upload_to=request_image_upload_to, db_index=True)
     uploaded_at = models.DateTimeField(auto_now_add=True)
 
+    # Перцептивний хеш фото (dHash) і його 16-бітні смуги для пошуку схожих фото за індексом
+    phash = models.BigIntegerField(null=True, blank=True, editable=False)
+    phash_band0 = models.IntegerField(null=True, blank=True, editable=False, db_index=True)
+    phash_band1 = models.IntegerField(null=True, blank=True, editable=False, db_index=True)
+    phash_band2 = models.IntegerField(null=True, blank=True, editable=False, db_index=True)
+    phash_band3 = models.IntegerField(null=True, blank=True, editable=False, db_index=True)
+
+    def set_phash(self, phash):
+        self.phash = phash
+        bands = phash_bands(phash) if phash is not None else [None] * PHASH_BANDS
+        self.phash_band0, self.phash_band1, self.phash_band2, self.phash_band3 = bands
+
+    def save(self, *args, **kwargs):
+        # Хеш рахується з нового файлу до його збереження у сховище
+        if self.phash is None and self.image and not self.image._committed:
+            self.set_phash(compute_dhash(self.image))
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+        if adding:
+            self.touch_request()
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        self.touch_request()
+        return result
+
+    def touch_request(self):
+        # Список фото входить у рядок заявки в дельта-синхронізації — клієнти мають побачити зміну.
+        # Лише updated_at через UPDATE: без Request.save, відбитків і лічильників.
+        Request.objects.filter(pk=self.request_id).update(updated_at=timezone.now())
+
     def __str__(self):
-        return f"Image {self.id} for Request {self.request.id}"
+        return f"Image {self.id} for Request {self.request_id}"
 
 class LocationUnit(models.Model):
     LOCATION_TYPE_CHOICES = [
@@ -260,3 +425,104 @@ class LocationUnit(models.Model):
     def __str__(self):
         return f"{self.name} — {self.street_name} {self.building_number}"
 
+
+# Сесія докачуваного завантаження фото: байти дописуються у тимчасовий файл частинами
+class UploadSession(models.Model):
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    request = models.ForeignKey('Request', on_delete=models.CASCADE, related_name='upload_sessions')
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='upload_sessions')
+    filename = models.CharField(max_length=255)
+    total_size = models.PositiveIntegerField()
+    received_bytes = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    @property
+    def temp_path(self):
+        return os.path.join(settings.UPLOAD_SESSIONS_DIR, f"{self.id}.part")
+
+    def __str__(self):
+        return f"Upload {self.id} ({self.received_bytes}/{self.total_size})"
+
+
+# Кількість заявок для кожної комбінації (локація, тип, статус) — для панелі менеджера.
+# Оновлюється разом зі змінами заявок; rebuild_request_counters перераховує з нуля.
+class RequestCounter(models.Model):
+    location_unit = models.ForeignKey('LocationUnit', on_delete=models.CASCADE, related_name='+')
+    type_request = models.CharField(max_length=50, choices=Request.TYPE_CHOICES)
+    status = models.CharField(max_length=50, choices=Request.STATUS_CHOICES)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['location_unit', 'type_request', 'status'], name='request_counter_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.location_unit_id} / {self.type_request} / {self.status}: {self.count}"
+
+
+# Запис про видалену заявку — щоб клієнти при дельта-синхронізації дізнались про видалення
+class RequestTombstone(models.Model):
+    request_id = models.BigIntegerField()
+    owner_id = models.BigIntegerField()  # Автор заявки (сам користувач теж міг бути видалений)
+    deleted_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    def __str__(self):
+        return f"Request {self.request_id} deleted at {self.deleted_at:%Y-%m-%d %H:%M}"
+
+
+# Черга вихідних листів: заповнюється масово, надсилається командою send_outbox
+class EmailOutbox(models.Model):
+    to_email = models.EmailField()
+    subject = models.CharField(max_length=255)
+    message = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['id'], name='outbox_unsent_idx', condition=models.Q(sent_at__isnull=True)),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} → {self.to_email}"
+
+
+# Звіт SLA за завершений місяць. Зберігається в БД, бо delete_old_requests видаляє виконані заявки,
+# і після цього місяць уже не перерахувати
+class SlaMonthReport(models.Model):
+    month = models.DateField(unique=True)  # Перше число місяця (місцевий час)
+    data = models.JSONField()
+    computed_at = models.DateTimeField(auto_now=True)
+
+    @classmethod
+    def invalidate(cls, completed_at):
+        cls.objects.filter(month=timezone.localtime(completed_at).date().replace(day=1)).delete()
+
+    def __str__(self):
+        return f"SLA {self.month:%Y-%m}"
+
+
+# Журнал запусків фонових задач (команда run_scheduler)
+class JobRun(models.Model):
+    STATUS_CHOICES = [
+        ('running', 'Виконується'),
+        ('success', 'Успішно'),
+        ('failed', 'Помилка'),
+    ]
+
+    job_name = models.CharField(max_length=100)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='running')
+    started_at = models.DateTimeField()
+    finished_at = models.DateTimeField(blank=True, null=True)
+    duration_ms = models.PositiveIntegerField(blank=True, null=True)
+    message = models.TextField(blank=True)
+    hostname = models.CharField(max_length=255, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['job_name', '-started_at'], name='jobrun_job_started_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.job_name} {self.started_at:%Y-%m-%d %H:%M} — {self.status}"
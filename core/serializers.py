@@ -2,10 +2,11 @@ import os
 
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
-from core.models import StudentCode, LecturerCode, ManagerCode, Request, RequestImage,LocationUnit
+from core.models import StudentCode, LecturerCode, ManagerCode, Request, RequestImage, LocationUnit, UploadSession
 from django.core.mail import send_mail
 from rest_framework.authtoken.models import Token
-import uuid
+from core.services.fingerprints import ACTIVE_STATUSES, compute_fingerprint, compute_simhash, find_near_duplicates
+from core.services.images import normalize_image
 import re
 import random
 
@@ -78,6 +79,10 @@ class RegisterSerializer(serializers.Serializer):
         if User.objects.filter(phone=phone).exists():
             raise serializers.ValidationError({"phone": "Користувач із таким номером телефону вже існує."})
 
+        # Один код — один активний акаунт
+        if User.objects.filter(registration_code=code, is_active=True).exists():
+            raise serializers.ValidationError({"code": "Цей код уже використано для реєстрації."})
+
         # Початкові змінні
         role = None
         profile_data = {}
@@ -112,6 +117,10 @@ class RegisterSerializer(serializers.Serializer):
                 else:
                     raise serializers.ValidationError({"code": "Код не знайдено або недійсний."})
 
+        # Старий акаунт без registration_code з тією ж роллю та ПІБ — код уже використано до 0018
+        if User.objects.filter(registration_code__isnull=True, role=role, **profile_data).exists():
+            raise serializers.ValidationError({"code": "Цей код уже використано для реєстрації."})
+
         # Додаємо оброблені значення до validated_data
         data['role'] = role
         data['profile_data'] = profile_data
@@ -123,20 +132,25 @@ class RegisterSerializer(serializers.Serializer):
         # Витягуємо значення
         role = validated_data['role']
         profile_data = validated_data['profile_data']
-        password = validated_data.get('password')
-
-        # Якщо пароль не надано — створюємо службовий випадковий
-        if not password:
-            password = uuid.uuid4().hex
-
-        # Створюємо користувача через кастомний менеджер
-        user = User.objects.create_user(
-            email=validated_data['email'],
-            phone=validated_data['phone'],
-            password=password,
-            role=role,
-            **profile_data  # Розпаковуємо first_name, last_name, patronymic
-        )
+        # Якщо пароль не надано — акаунт без пароля (вхід за кодом), без дорогого хешування
+        password = validated_data.get('password') or None
+
+        # Акаунт міг бути заздалегідь створений командою provision_accounts
+        user = User.objects.filter(registration_code=validated_data['code'], is_active=False).first()
+        if user:
+            user.email = User.objects.normalize_email(validated_data['email'])
+            user.phone = validated_data['phone']
+            user.set_password(password)
+        else:
+            # Створюємо користувача через кастомний менеджер
+            user = User.objects.create_user(
+                email=validated_data['email'],
+                phone=validated_data['phone'],
+                password=password,
+                role=role,
+                registration_code=validated_data['code'],
+                **profile_data  # Розпаковуємо first_name, last_name, patronymic
+            )
 
         # Активуємо акаунт
         user.is_active = True
@@ -265,8 +279,10 @@ class RequestCreateSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         user = self.context['request'].user
+        near_duplicates = getattr(self, 'near_duplicates', [])
         request = Request.objects.create(
             user=user,
+            possible_duplicate_of_id=near_duplicates[0][1] if near_duplicates else None,
             **validated_data  # без code — модель сама згенерує
         )
         return request
@@ -295,18 +311,23 @@ class RequestCreateSerializer(serializers.ModelSerializer):
         if location_unit.location_type == "university" and entrance:
             raise serializers.ValidationError("Для університету не потрібно вказувати під'їзд.")
 
-        #  Перевірка на дублікат
+        #  Перевірка на дублікат (за індексованим відбитком вмісту)
+        fingerprint = compute_fingerprint(name, description, location_unit.id, room_number)
         duplicate = Request.objects.filter(
             user=user,
-            name=name,
-            description=description,
-            location_unit=location_unit,
-            room_number=room_number,
-            status__in=["empty", "pending", "approved", "on_check"]
+            content_fingerprint=fingerprint,
+            status__in=ACTIVE_STATUSES
         )
         if duplicate.exists():
             raise serializers.ValidationError("Схожа заявка вже існує та ще не завершена.")
 
+        # Схожі заявки інших мешканців тієї ж кімнати — не помилка, лише позначка для менеджера
+        self.near_duplicates = find_near_duplicates(
+            location_unit.id,
+            room_number,
+            compute_simhash(f"{name} {description}"),
+        )
+
         return attrs
 
 
@@ -315,6 +336,10 @@ class LocationUnitSerializer(serializers.ModelSerializer):
         model = LocationUnit
         fields = ['id', 'name', 'location_type', 'street_name', 'building_number', 'comment']
 
+# Статуси, у яких користувач бачить контакти майстра (менеджер бачить завжди)
+MASTER_VISIBLE_STATUSES = ['in_progress', 'done']  # або ['in_progress', 'completed'], якщо використовуєш таке значення
+
+
 class RequestDetailSerializer(serializers.ModelSerializer):
     assigned_master = serializers.SerializerMethodField()
     location_unit = LocationUnitSerializer(read_only=True)
@@ -347,7 +372,17 @@ class RequestDetailSerializer(serializers.ModelSerializer):
             'room_number',
             'entrance_number',
             'user_confirmed',
+            'possible_duplicate_of',
         ]
+        read_only_fields = ['possible_duplicate_of']
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        # Розріджений набір полів (?fields=...) — решта полів не серіалізується
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
 
     def validate_status(self, value):
         if self.instance and self.context['request'].user.role in ['student', 'lecturer']:
@@ -357,14 +392,13 @@ class RequestDetailSerializer(serializers.ModelSerializer):
 
     def get_assigned_master(self, obj):
         user = self.context['request'].user
-        visible_statuses = ['in_progress', 'done']  # або ['in_progress', 'completed'], якщо використовуєш таке значення
 
         # Показати завжди менеджеру
         if user.role == 'manager':
             return self.get_master_block(obj)
 
         # Показати користувачу тільки коли заявка в дозволеному статусі
-        if obj.status in visible_statuses:
+        if obj.status in MASTER_VISIBLE_STATUSES:
             return self.get_master_block(obj)
 
         # Інакше не показувати
@@ -377,6 +411,22 @@ class RequestDetailSerializer(serializers.ModelSerializer):
             "phone": obj.assigned_master_phone,
             "company_phone": obj.assigned_company_phone
         }
+# Обмеження для фото заявок
+IMAGE_EXTENSIONS = ['.jpg', '.jpeg', '.png']
+MAX_IMAGE_SIZE = 5 * 1024 * 1024
+
+
+def validate_image_name_and_size(name, size):
+    # 1. Перевірка формату
+    ext = os.path.splitext(name)[1].lower()
+    if ext not in IMAGE_EXTENSIONS:
+        raise serializers.ValidationError("Формат файлу має бути .jpg, .jpeg або .png")
+
+    # 2. Перевірка розміру
+    if size > MAX_IMAGE_SIZE:
+        raise serializers.ValidationError("Максимальний розмір зображення — 5 МБ")
+
+
 class RequestImageSerializer(serializers.ModelSerializer):
     class Meta:
         model = RequestImage
@@ -384,17 +434,34 @@ class RequestImageSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'uploaded_at', 'request']
 
     def validate_image(self, image):
-        # 1. Перевірка формату
-        valid_extensions = ['.jpg', '.jpeg', '.png']
-        ext = os.path.splitext(image.name)[1].lower()
-        if ext not in valid_extensions:
-            raise serializers.ValidationError("Формат файлу має бути .jpg, .jpeg або .png")
+        validate_image_name_and_size(image.name, image.size)
+        # Зберігаємо не оригінал, а зменшену WebP-копію без метаданих
+        return normalize_image(image)
+
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = UploadSession
+        fields = ['id', 'filename', 'total_size', 'received_bytes', 'created_at']
+        read_only_fields = ['id', 'received_bytes', 'created_at']
 
-        # 2. Перевірка розміру
-        if image.size > 5 * 1024 * 1024:
-            raise serializers.ValidationError("Максимальний розмір зображення — 5 МБ")
+    def validate(self, attrs):
+        # Ті самі правила, що й для звичайного завантаження — ще до передачі байтів
+        try:
+            validate_image_name_and_size(attrs['filename'], attrs['total_size'])
+        except serializers.ValidationError as exc:
+            raise serializers.ValidationError({"filename": exc.detail})
+        if attrs['total_size'] == 0:
+            raise serializers.ValidationError({"total_size": "Файл порожній."})
+        return attrs
+
+class ClaimNextRequestSerializer(serializers.Serializer):
+    # Необов'язкові фільтри черги для ClaimNextRequestView
+    location_unit = serializers.PrimaryKeyRelatedField(
+        queryset=LocationUnit.objects.all(), required=False, allow_null=True
+    )
+    type_request = serializers.ChoiceField(choices=Request.TYPE_CHOICES, required=False, allow_blank=True)
 
-        return image
 
 class UserProfileSerializer(serializers.ModelSerializer):
     class Meta:
@@ -406,6 +473,7 @@ class UserProfileSerializer(serializers.ModelSerializer):
             'last_name',
             'patronymic',
             'role',
+            'notification_mode',
         ]
         read_only_fields = ['first_name', 'last_name', 'patronymic', 'role']
 
@@ -415,6 +483,11 @@ class UserProfileSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Користувач із такою поштою вже існує.")
         return value
 
+    def validate_notification_mode(self, value):
+        if value != 'immediate' and self.instance.role != 'manager':
+            raise serializers.ValidationError("Дайджести доступні лише менеджерам.")
+        return value
+
     def validate_phone(self, value):
         value = normalize_phone(value)
         user = self.instance
@@ -0,0 +1,147 @@
+import hashlib
+import re
+from functools import reduce
+from itertools import combinations
+from operator import or_
+
+from django.db.models import Q
+
+# Скільки бітів SimHash можуть відрізнятись, щоб заявки вважались схожими
+# (для коротких текстів у випадкових пар відстань близько 32)
+NEAR_DUPLICATE_MAX_DISTANCE = 12
+
+# Скільки бітів dHash фото можуть відрізнятись, щоб фото вважались однаковими
+PHOTO_DUPLICATE_MAX_DISTANCE = 10
+
+# 64-бітний хеш фото зберігається ще й як 4 індексовані 16-бітні смуги (multi-index hashing)
+PHASH_BANDS = 4
+PHASH_BAND_BITS = 16
+
+ACTIVE_STATUSES = ["empty", "pending", "approved", "on_check"]
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+_MASK_64 = (1 << 64) - 1
+
+
+def normalize_text(text):
+    """
+    Нормалізує текст: нижній регістр, без пунктуації, з одинарними пробілами.
+    """
+    return " ".join(_WORD_RE.findall((text or "").lower()))
+
+
+def compute_fingerprint(name, description, location_unit_id, room_number):
+    """
+    Відбиток вмісту заявки для точної перевірки на дублікат (sha256, 64 hex-символи).
+    """
+    parts = [
+        normalize_text(name),
+        normalize_text(description),
+        str(location_unit_id or ""),
+        normalize_text(room_number),
+    ]
+    return hashlib.sha256("\x1f".join(parts).encode()).hexdigest()
+
+
+def _features(text):
+    # Ознаки — символьні 4-грами: стійкі до закінчень слів і дрібних описок
+    text = normalize_text(text)
+    return [text[i:i + 4] for i in range(max(len(text) - 3, 1))]
+
+
+def compute_simhash(text):
+    """
+    64-бітний SimHash тексту. Схожі тексти дають хеші з малою відстанню Геммінга.
+    Повертає знакове число, щоб воно вміщалось у BigIntegerField.
+    """
+    weights = [0] * 64
+    for feature in _features(text):
+        h = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "big")
+        for bit in range(64):
+            weights[bit] += 1 if h >> bit & 1 else -1
+
+    value = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            value |= 1 << bit
+
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def hamming_distance(a, b):
+    return ((a ^ b) & _MASK_64).bit_count()
+
+
+def find_near_duplicates(location_unit_id, room_number, simhash, exclude_id=None,
+                         max_distance=NEAR_DUPLICATE_MAX_DISTANCE):
+    """
+    Шукає активні заявки (будь-яких користувачів) у тій самій кімнаті зі схожим описом.
+    Кандидати вибираються за індексом (location_unit, room_number), тож їх небагато.
+    Повертає список (відстань, id) від найсхожішої.
+    """
+    from core.models import Request
+
+    candidates = Request.objects.filter(
+        location_unit_id=location_unit_id,
+        room_number=room_number,
+        status__in=ACTIVE_STATUSES,
+        content_simhash__isnull=False,
+    )
+    if exclude_id:
+        candidates = candidates.exclude(id=exclude_id)
+
+    matches = []
+    for request_id, other in candidates.values_list("id", "content_simhash"):
+        distance = hamming_distance(simhash, other)
+        if distance <= max_distance:
+            matches.append((distance, request_id))
+
+    return sorted(matches)
+
+
+def phash_bands(phash):
+    """
+    Розбиває 64-бітний хеш на PHASH_BANDS беззнакових 16-бітних смуг (від молодших бітів).
+    """
+    unsigned = phash & _MASK_64
+    band_mask = (1 << PHASH_BAND_BITS) - 1
+    return [unsigned >> (band * PHASH_BAND_BITS) & band_mask for band in range(PHASH_BANDS)]
+
+
+def _band_neighbours(value, radius):
+    # Усі 16-бітні значення на відстані Геммінга не більше radius від value
+    neighbours = [value]
+    for distance in range(1, radius + 1):
+        for bits in combinations(range(PHASH_BAND_BITS), distance):
+            neighbours.append(reduce(lambda acc, bit: acc ^ (1 << bit), bits, value))
+    return neighbours
+
+
+def find_similar_images(phash, exclude_request_id=None, max_distance=PHOTO_DUPLICATE_MAX_DISTANCE):
+    """
+    Шукає фото з хешем на відстані не більше max_distance.
+    Якщо хеші відрізняються не більше ніж на max_distance бітів, то хоча б одна з
+    4 смуг відрізняється не більше ніж на max_distance // 4 бітів. Тож кандидати
+    вибираються за індексами смуг (для відстані 10 — по 137 значень на смугу),
+    а точна відстань перевіряється лише для них.
+    Повертає список (відстань, request_id, image_id) від найсхожішого.
+    """
+    from core.models import RequestImage
+
+    radius = max_distance // PHASH_BANDS
+    condition = reduce(or_, (
+        Q(**{f"phash_band{band}__in": _band_neighbours(value, radius)})
+        for band, value in enumerate(phash_bands(phash))
+    ))
+
+    candidates = RequestImage.objects.filter(condition)
+    if exclude_request_id:
+        candidates = candidates.exclude(request_id=exclude_request_id)
+
+    matches = []
+    for image_id, request_id, other in candidates.values_list("id", "request_id", "phash"):
+        distance = hamming_distance(phash, other)
+        if distance <= max_distance:
+            matches.append((distance, request_id, image_id))
+
+    return sorted(matches)
@@ -0,0 +1,97 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+from rest_framework import serializers
+
+# Формати, які реально приймаємо після декодування (розширення файлу не рахується).
+# MPO — багатокадровий JPEG з камер багатьох телефонів; береться лише перший кадр.
+ALLOWED_FORMATS = {'JPEG', 'MPO', 'PNG'}
+
+_executor = None
+
+
+def normalize_image(upload):
+    """
+    Декодує фото, повертає його за EXIF-орієнтацією, зменшує до IMAGE_MAX_DIMENSION
+    і перекодовує у WebP. Метадані (EXIF, GPS) у новий файл не потрапляють.
+    Повертає ContentFile з розширенням .webp; не-зображення відхиляє ValidationError.
+    """
+    max_dimension = settings.IMAGE_MAX_DIMENSION
+    upload.seek(0)
+
+    try:
+        with Image.open(upload) as img:
+            if img.format not in ALLOWED_FORMATS:
+                raise serializers.ValidationError("Файл не є зображенням JPEG або PNG.")
+
+            # Основне зображення MPO — перший кадр (інші — глибина, превʼю); у WebP іде лише він
+            img.seek(0)
+
+            # Для JPEG декодер одразу зменшує в 2/4/8 разів — 12 Мп фото не розпаковується повністю
+            img.draft('RGB', (max_dimension, max_dimension))
+            img = ImageOps.exif_transpose(img)
+
+            has_alpha = img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info)
+            img = img.convert('RGBA' if has_alpha else 'RGB')
+            img.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
+
+            output = BytesIO()
+            img.save(output, format='WEBP', quality=settings.IMAGE_WEBP_QUALITY, method=4)
+    except (OSError, SyntaxError, ValueError, Image.DecompressionBombError):
+        raise serializers.ValidationError("Не вдалося прочитати зображення.")
+
+    name = os.path.splitext(os.path.basename(upload.name))[0] + '.webp'
+    return ContentFile(output.getvalue(), name=name)
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.IMAGE_NORMALIZE_WORKERS, thread_name_prefix='image-normalize'
+        )
+    return _executor
+
+
+def validate_image_serializers(image_serializers):
+    """
+    Валідує кілька серіалізаторів фото паралельно: Pillow відпускає GIL під час
+    декодування й стиснення, тож потоки справді працюють одночасно.
+    Після цього помилки піднімаються як звичайно — з першого невалідного файлу.
+    """
+    if len(image_serializers) > 1:
+        list(_get_executor().map(lambda serializer: serializer.is_valid(), image_serializers))
+
+    for serializer in image_serializers:
+        serializer.is_valid(raise_exception=True)
+
+
+def compute_dhash(file):
+    """
+    64-бітний різницевий хеш (dHash) зображення: зменшене 9x8 у відтінках сірого,
+    кожен біт — чи світліший піксель за сусіда праворуч. Перестиснення, зміна розміру
+    й дрібні правки майже не змінюють хеш. Повертає знакове число для BigIntegerField
+    або None, якщо файл не вдалося прочитати.
+    """
+    try:
+        file.seek(0)
+        with Image.open(file) as img:
+            img.draft('L', (64, 64))
+            img = ImageOps.exif_transpose(img).convert('L').resize((9, 8), Image.Resampling.LANCZOS)
+            pixels = img.tobytes()
+    except (OSError, SyntaxError, ValueError, Image.DecompressionBombError):
+        return None
+    finally:
+        file.seek(0)
+
+    value = 0
+    for row in range(8):
+        for col in range(8):
+            left, right = pixels[row * 9 + col], pixels[row * 9 + col + 1]
+            value = value << 1 | (left > right)
+
+    return value - (1 << 64) if value >= 1 << 63 else value
@@ -0,0 +1,41 @@
+import json
+
+# orjson (C-розширення) — необов'язкова залежність, без неї працює стандартний json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps(obj):
+    """
+    Компактний JSON у байтах — той самий формат, що й у JSONRenderer DRF.
+    Як і JSONRenderer, екрануємо U+2028/U+2029: в UTF-8 вони більше ніде не трапляються,
+    тож заміна в байтах безпечна.
+    """
+    if orjson is not None:
+        data = orjson.dumps(obj)
+    else:
+        data = json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode()
+    return data.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+def stream_json_array(rows, rows_per_chunk=200):
+    """
+    Генератор: кодує рядки в JSON-масив частинами по `rows_per_chunk` рядків.
+    У пам'яті одночасно тримається лише одна частина.
+    """
+    yield b'['
+    separator = b''
+    chunk = []
+
+    for row in rows:
+        chunk.append(dumps(row))
+        if len(chunk) >= rows_per_chunk:
+            yield separator + b','.join(chunk)
+            separator = b','
+            chunk = []
+
+    if chunk:
+        yield separator + b','.join(chunk)
+    yield b']'
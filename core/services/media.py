@@ -0,0 +1,116 @@
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils.http import http_date
+
+# Імена файлів медіа унікальні й не змінюються, тож кешувати можна «назавжди»
+MEDIA_CACHE_CONTROL = 'private, max-age=31536000, immutable'
+
+_RANGE_RE = re.compile(r'bytes=(\d*)-(\d*)')
+_CHUNK_SIZE = 64 * 1024
+
+
+def serve_media_file(request, name):
+    """
+    Віддає файл зі сховища медіа.
+    Якщо налаштовано MEDIA_ACCEL — передає відправлення веб-серверу (nginx / Apache),
+    інакше віддає сам з підтримкою Range, ETag та кешування.
+    """
+    content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+
+    if settings.MEDIA_ACCEL == 'nginx':
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = settings.MEDIA_ACCEL_PREFIX + quote(name)
+        response['Cache-Control'] = MEDIA_CACHE_CONTROL
+        return response
+
+    path = default_storage.path(name)
+
+    if settings.MEDIA_ACCEL == 'sendfile':
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = path
+        response['Cache-Control'] = MEDIA_CACHE_CONTROL
+        return response
+
+    return _serve_local_file(request, path, content_type)
+
+
+def _serve_local_file(request, path, content_type):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        raise Http404('Файл не знайдено.')
+
+    size = stat.st_size
+    etag = f'"{stat.st_mtime_ns:x}-{size:x}"'
+    headers = {
+        'ETag': etag,
+        'Last-Modified': http_date(stat.st_mtime),
+        'Cache-Control': MEDIA_CACHE_CONTROL,
+        'Accept-Ranges': 'bytes',
+    }
+
+    if etag in request.headers.get('If-None-Match', ''):
+        return HttpResponse(status=304, headers=headers)
+
+    byte_range = request.headers.get('Range')
+    if_range = request.headers.get('If-Range')
+    if byte_range and (not if_range or if_range == etag):
+        parsed = parse_byte_range(byte_range, size)
+        if parsed is False:
+            return HttpResponse(status=416, headers={**headers, 'Content-Range': f'bytes */{size}'})
+        if parsed:
+            start, end = parsed
+            length = end - start + 1
+            response = StreamingHttpResponse(
+                _iter_file_range(path, start, length),
+                status=206,
+                content_type=content_type,
+                headers=headers,
+            )
+            response['Content-Length'] = str(length)
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+            return response
+
+    return FileResponse(open(path, 'rb'), content_type=content_type, headers=headers)
+
+
+def parse_byte_range(header, size):
+    """
+    Розбирає заголовок Range з одним діапазоном.
+    Повертає (start, end), None — якщо заголовок треба ігнорувати (віддаємо файл цілком),
+    або False — якщо діапазон неможливо задовольнити (416).
+    """
+    match = _RANGE_RE.fullmatch(header.strip())
+    if not match or match.groups() == ('', ''):
+        return None
+
+    first, last = match.groups()
+    if not first:
+        # Суфікс: останні N байтів
+        suffix = int(last)
+        if suffix == 0:
+            return False
+        return max(size - suffix, 0), size - 1
+
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def _iter_file_range(path, start, length):
+    with open(path, 'rb') as f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(_CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
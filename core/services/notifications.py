@@ -16,6 +16,13 @@ def render_request_completed_message(request_obj, manager_email):
         f"Якщо у вас є зауваження — зверніться за адресою: {manager_email} протягом 30 днів."
     )
 
+def render_request_auto_completed_message(request_obj, support_email=None):
+    # Завершено автоматично (complete_stale_requests) — менеджера, якому можна відповісти, немає
+    message = f"Ваша заявка №{request_obj.code} завершена."
+    if support_email:
+        message += f"\nЯкщо у вас є зауваження — зверніться за адресою: {support_email} протягом 30 днів."
+    return message
+
 def render_request_rejected_message(request_obj):
     return (
         f"Заявку №{request_obj.code} відхилено.\n"
@@ -44,3 +51,11 @@ def render_request_restored_message(request_obj):
         f"Ваша заявка №{request_obj.code}, яка була завершена, відновлена менеджером.\n"
         f"Вона знову активна для подальшої обробки."
     )
+
+def render_new_request_message(row):
+    return f"Нова заявка на перевірку: {row['code']} — {row['name']}"
+
+def render_manager_digest_message(rows):
+    lines = [f"Нових заявок на перевірку: {len(rows)}.", ""]
+    lines += [f"• {row['code']} — {row['name']}" for row in rows]
+    return "\n".join(lines)
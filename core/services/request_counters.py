@@ -0,0 +1,85 @@
+from collections import Counter
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+# Поля заявки, за якими ведуться лічильники
+COUNTER_FIELDS = ('location_unit_id', 'type_request', 'status')
+
+
+def counter_key(request_obj):
+    return tuple(getattr(request_obj, field) for field in COUNTER_FIELDS)
+
+
+def apply_counter_deltas(deltas):
+    """
+    Додає зміни {(location_unit_id, type_request, status): delta} до таблиці RequestCounter.
+    Викликається в тій самій транзакції, що й зміна заявок. Ключі обробляються
+    в одному порядку, щоб паралельні транзакції не блокували одна одну навхрест.
+    """
+    from core.models import RequestCounter
+
+    for key in sorted(key for key, delta in deltas.items() if delta):
+        delta = deltas[key]
+        lookup = dict(zip(COUNTER_FIELDS, key))
+        counters = RequestCounter.objects.filter(**lookup)
+        if counters.update(count=F('count') + delta) or delta < 0:
+            # Від'ємна зміна без рядка — лічильник уже розійшовся, його виправить rebuild_request_counters
+            continue
+        try:
+            with transaction.atomic():
+                RequestCounter.objects.create(count=delta, **lookup)
+        except IntegrityError:
+            # Рядок щойно створила паралельна транзакція
+            counters.update(count=F('count') + delta)
+
+
+def update_requests(queryset, **values):
+    """
+    Масовий UPDATE заявок з оновленням лічильників, якщо змінюються поля лічильників
+    (задаються значеннями, не виразами: status='done', location_unit_id=3).
+    Повертає кількість оновлених заявок.
+    """
+    if not any(field in values for field in COUNTER_FIELDS):
+        return queryset.update(**values)
+
+    with transaction.atomic():
+        rows = list(queryset.select_for_update().values_list('id', *COUNTER_FIELDS))
+        if not rows:
+            return 0
+
+        deltas = Counter()
+        for _, *key in rows:
+            new_key = tuple(values.get(field, value) for field, value in zip(COUNTER_FIELDS, key))
+            deltas[tuple(key)] -= 1
+            deltas[new_key] += 1
+
+        updated = queryset.model.objects.filter(id__in=[row[0] for row in rows]).update(**values)
+        apply_counter_deltas(deltas)
+
+    return updated
+
+
+def rebuild_counters():
+    """
+    Перераховує всі лічильники з таблиці заявок. На PostgreSQL таблиця заявок
+    блокується від змін на час перерахунку, щоб лічильники точно збіглися з даними.
+    Повертає кількість рядків лічильників.
+    """
+    from django.db import connection
+    from django.db.models import Count
+
+    from core.models import Request, RequestCounter
+
+    with transaction.atomic():
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute(f'LOCK TABLE {Request._meta.db_table} IN SHARE MODE')
+
+        rows = Request.objects.values(*COUNTER_FIELDS).annotate(count=Count('id')).order_by()
+        counters = [RequestCounter(**row) for row in rows]
+
+        RequestCounter.objects.all().delete()
+        RequestCounter.objects.bulk_create(counters)
+
+    return len(counters)
@@ -0,0 +1,165 @@
+from collections import defaultdict
+from itertools import islice
+
+from rest_framework import serializers
+
+from core.models import RequestImage
+from core.serializers import MASTER_VISIBLE_STATUSES, RequestDetailSerializer
+
+# Усі поля відповіді — у порядку RequestDetailSerializer.Meta.fields
+REQUEST_FIELDS = list(RequestDetailSerializer.Meta.fields)
+
+# Колонки БД, потрібні для кожного поля відповіді (придатні і для .values(), і для .only())
+FIELD_COLUMNS = {
+    'id': ['id'],
+    'code': ['code'],
+    'name': ['name'],
+    'type_request': ['type_request'],
+    'description': ['description'],
+    'status': ['status'],
+    'created_at': ['created_at'],
+    'assigned_master': [
+        'status',
+        'assigned_master_name',
+        'assigned_master_company',
+        'assigned_master_phone',
+        'assigned_company_phone',
+    ],
+    'assigned_master_name': ['assigned_master_name'],
+    'assigned_master_company': ['assigned_master_company'],
+    'assigned_master_phone': ['assigned_master_phone'],
+    'assigned_company_phone': ['assigned_company_phone'],
+    'work_date': ['work_date'],
+    'images': [],  # окремий запит на партію
+    'location_unit': [
+        'location_unit_id',
+        'location_unit__name',
+        'location_unit__location_type',
+        'location_unit__street_name',
+        'location_unit__building_number',
+        'location_unit__comment',
+    ],
+    'room_number': ['room_number'],
+    'entrance_number': ['entrance_number'],
+    'user_confirmed': ['user_confirmed'],
+    'possible_duplicate_of': ['possible_duplicate_of_id'],
+}
+
+# Дати форматуються тим самим полем DRF, що й у RequestDetailSerializer
+_format_datetime = serializers.DateTimeField().to_representation
+
+
+def parse_fields_param(value):
+    """
+    Розбирає параметр ?fields=id,code,name.
+    Повертає список полів у порядку серіалізатора або None, якщо параметр не задано.
+    """
+    if not value:
+        return None
+
+    requested = {name.strip() for name in value.split(',') if name.strip()}
+    unknown = requested - set(REQUEST_FIELDS)
+    if unknown:
+        raise serializers.ValidationError({"fields": f"Невідомі поля: {', '.join(sorted(unknown))}."})
+
+    return [name for name in REQUEST_FIELDS if name in requested]
+
+
+def columns_for_fields(fields):
+    columns = ['id']
+    for name in fields:
+        columns += [column for column in FIELD_COLUMNS[name] if column not in columns]
+    return columns
+
+
+def iter_request_rows(queryset, user, chunk_size=500, fields=None):
+    """
+    Швидкий шлях для списку заявок: рядки будуються з .values() партіями.
+    Результат байт-у-байт збігається з RequestDetailSerializer(many=True).
+    Якщо задано `fields`, вибираються лише потрібні колонки, а фото — лише коли вони запитані.
+    БД (основна чи репліка) обирається одразу під час виклику: потокова відповідь
+    читає рядки вже після того, як ReadYourWritesMiddleware зняв закріплення за основною БД.
+    """
+    return _iter_request_rows(queryset.using(queryset.db), user, chunk_size, fields)
+
+
+def _iter_request_rows(queryset, user, chunk_size, fields):
+    fields = fields or REQUEST_FIELDS
+    builders = [(name, FIELD_BUILDERS[name]) for name in fields]
+    with_images = 'images' in fields
+
+    # Правило видимості майстра обчислюється один раз, а не для кожного рядка
+    show_master_always = user.role == 'manager'
+
+    values = queryset.values(*columns_for_fields(fields)).iterator(chunk_size=chunk_size)
+    while True:
+        chunk = list(islice(values, chunk_size))
+        if not chunk:
+            break
+
+        images = defaultdict(list)
+        if with_images:
+            image_pairs = RequestImage.objects.using(queryset.db).filter(
+                request_id__in=[row['id'] for row in chunk]
+            ).values_list('request_id', 'id')
+            for request_id, image_id in image_pairs:
+                images[request_id].append(image_id)
+
+        for row in chunk:
+            row['images'] = images[row['id']]
+            row['show_master'] = show_master_always or row.get('status') in MASTER_VISIBLE_STATUSES
+            yield {name: build(row) for name, build in builders}
+
+
+def _assigned_master(row):
+    if not row['show_master']:
+        return None
+    return {
+        "name": row['assigned_master_name'],
+        "company": row['assigned_master_company'],
+        "phone": row['assigned_master_phone'],
+        "company_phone": row['assigned_company_phone'],
+    }
+
+
+def _location_unit(row):
+    return {
+        'id': row['location_unit_id'],
+        'name': row['location_unit__name'],
+        'location_type': row['location_unit__location_type'],
+        'street_name': row['location_unit__street_name'],
+        'building_number': row['location_unit__building_number'],
+        'comment': row['location_unit__comment'],
+    }
+
+
+def _column(name):
+    return lambda row: row[name]
+
+
+def _datetime_column(name):
+    return lambda row: _format_datetime(row[name])
+
+
+# Як будується кожне поле відповіді з рядка .values()
+FIELD_BUILDERS = {
+    'id': _column('id'),
+    'code': _column('code'),
+    'name': _column('name'),
+    'type_request': _column('type_request'),
+    'description': _column('description'),
+    'status': _column('status'),
+    'created_at': _datetime_column('created_at'),
+    'assigned_master': _assigned_master,
+    'assigned_master_name': _column('assigned_master_name'),
+    'assigned_master_company': _column('assigned_master_company'),
+    'assigned_master_phone': _column('assigned_master_phone'),
+    'assigned_company_phone': _column('assigned_company_phone'),
+    'work_date': _datetime_column('work_date'),
+    'images': _column('images'),
+    'location_unit': _location_unit,
+    'room_number': _column('room_number'),
+    'entrance_number': _column('entrance_number'),
+    'user_confirmed': _column('user_confirmed'),
+    'possible_duplicate_of': _column('possible_duplicate_of_id'),
+}
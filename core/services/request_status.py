@@ -1,6 +1,11 @@
 from datetime import timedelta
+from django.db.models import Q
 from django.utils.timezone import now
 
+# Через скільки після дати візиту заявку можна завершити без підтвердження користувача
+DONE_AFTER_WORK_DATE = timedelta(days=1)
+
+
 def can_set_done(request_obj):
     """
     Перевіряє, чи можна перевести заявку в статус 'done'.
@@ -9,7 +14,24 @@ def can_set_done(request_obj):
     if request_obj.user_confirmed:
         return True, "Користувач підтвердив виконання"
 
-    if request_obj.work_date and now() > request_obj.work_date + timedelta(days=1):
+    if request_obj.work_date and now() > request_obj.work_date + DONE_AFTER_WORK_DATE:
         return True, "Пройшов один день після дати візиту"
 
     return False, "Заявку не можна завершити — не підтверджено користувачем і не пройшов час"
+
+
+def can_set_done_q(moment=None):
+    """
+    Те саме правило, що й can_set_done, у вигляді Q-фільтра для масових операцій.
+    """
+    moment = moment or now()
+    return Q(user_confirmed=True) | Q(work_date__lt=moment - DONE_AFTER_WORK_DATE)
+
+
+def mark_submitted(request_obj):
+    """
+    Відправляє заявку на перевірку. Менеджерам повідомляє команда send_manager_notifications.
+    """
+    request_obj.status = 'pending'
+    request_obj.submitted_at = now()
+    request_obj.save()
@@ -0,0 +1,76 @@
+import threading
+from collections import Counter
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.db import transaction
+from rest_framework import serializers
+
+from core.models import RequestTombstone
+from core.services.request_counters import COUNTER_FIELDS, apply_counter_deltas
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+_state = threading.local()
+
+
+def encode_cursor(moment, request_id=None):
+    """
+    Курсор синхронізації: мікросекунди від епохи, за потреби з id останньої заявки ("<мкс>:<id>").
+    """
+    micros = (moment - _EPOCH) // _MICROSECOND
+    return f"{micros}:{request_id}" if request_id is not None else str(micros)
+
+
+def decode_cursor(cursor):
+    try:
+        micros, _, request_id = cursor.partition(':')
+        return _EPOCH + int(micros) * _MICROSECOND, int(request_id) if request_id else None
+    except (ValueError, OverflowError):
+        raise serializers.ValidationError({"since": "Некоректний курсор синхронізації."})
+
+
+def bulk_delete_in_progress():
+    # Надгробки та лічильники для такого видалення записує сам delete_requests
+    return getattr(_state, 'suppress', False)
+
+
+def delete_requests(queryset, batch_size=None):
+    """
+    Масово видаляє заявки, записуючи надгробки одним INSERT і лічильники одним
+    оновленням на групу, замість окремих записів із сигналу post_delete для кожної заявки.
+    З batch_size видаляє партіями за id, кожну — у власній короткій транзакції,
+    щоб не тримати блокування і не накопичувати один величезний обсяг змін.
+    Повертає кількість видалених заявок.
+    """
+    if batch_size is None:
+        return _delete_batch(queryset)
+
+    deleted = 0
+    while True:
+        batch = queryset.order_by('id').values_list('id', flat=True)[:batch_size]
+        count = _delete_batch(queryset.model.objects.filter(id__in=list(batch)))
+        if not count:
+            return deleted
+        deleted += count
+
+
+def _delete_batch(queryset):
+    with transaction.atomic():
+        rows = list(queryset.values_list('id', 'user_id', *COUNTER_FIELDS))
+        if not rows:
+            return 0
+
+        RequestTombstone.objects.bulk_create([
+            RequestTombstone(request_id=request_id, owner_id=owner_id) for request_id, owner_id, *_ in rows
+        ])
+        deleted = Counter(tuple(key) for _, _, *key in rows)
+        apply_counter_deltas({key: -count for key, count in deleted.items()})
+
+        _state.suppress = True
+        try:
+            queryset.model.objects.filter(id__in=[row[0] for row in rows]).delete()
+        finally:
+            _state.suppress = False
+
+    return len(rows)
@@ -0,0 +1,162 @@
+import heapq
+import logging
+import os
+import re
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import Counter
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from core.models import Request
+
+logger = logging.getLogger(__name__)
+
+_SEPARATORS_RE = re.compile(r'[\s\-_./]+')
+
+# Більше за будь-який символ — верхня межа діапазону ключів із заданим префіксом
+_PREFIX_END = '\U0010ffff'
+
+
+def normalize_room(value):
+    """
+    Ключ кімнати для пошуку: нижній регістр, без пробілів і роздільників ("305-А" -> "305а").
+    """
+    return _SEPARATORS_RE.sub('', (value or '').lower())
+
+
+class RoomEntry:
+    __slots__ = ('count', 'spellings', 'entrances')
+
+    def __init__(self):
+        self.count = 0
+        self.spellings = Counter()
+        self.entrances = Counter()
+
+
+class LocationRooms:
+    """
+    Кімнати однієї локації: відсортований список ключів (пошук префікса через bisect)
+    і дані про кожну кімнату.
+    """
+    __slots__ = ('keys', 'entries')
+
+    def __init__(self):
+        self.keys = []
+        self.entries = {}
+
+    def add(self, room_number, entrance_number):
+        key = normalize_room(room_number)
+        if not key:
+            return
+        entry = self.entries.get(key)
+        if entry is None:
+            entry = self.entries[key] = RoomEntry()
+            insort(self.keys, key)
+        entry.count += 1
+        entry.spellings[room_number.strip()] += 1
+        if entrance_number:
+            entry.entrances[entrance_number.strip()] += 1
+
+    def suggest(self, prefix, limit):
+        start = bisect_left(self.keys, prefix)
+        end = bisect_left(self.keys, prefix + _PREFIX_END, start)
+        # Найчастіші кімнати з потрібним префіксом, за однакової частоти — за алфавітом
+        best = heapq.nsmallest(limit, range(start, end), key=lambda i: (-self.entries[self.keys[i]].count, i))
+        return [self._to_dict(self.entries[self.keys[i]]) for i in best]
+
+    @staticmethod
+    def _to_dict(entry):
+        entrance = entry.entrances.most_common(1)
+        return {
+            "room_number": entry.spellings.most_common(1)[0][0],
+            "entrance_number": entrance[0][0] if entrance else None,
+            "count": entry.count,
+        }
+
+
+class RoomIndex:
+    """
+    Індекс номерів кімнат з історії заявок, окремий для кожного процесу.
+    Оновлюється фоновим потоком: нові заявки дочитуються за id (вище останнього прочитаного)
+    раз на ROOM_INDEX_REFRESH_SECONDS, повна перебудова раз на ROOM_INDEX_REBUILD_SECONDS
+    підхоплює змінені й видалені заявки. Запити лише читають поточний знімок і до БД не звертаються.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()  # доступ до даних індексу
+        self._start_lock = threading.Lock()  # запуск фонового потоку
+        self._thread = None
+        self._pid = None
+        self._locations = {}
+        self._last_id = 0
+        self._built_at = None
+
+    def suggest(self, location_unit_id, query, limit=10):
+        self._ensure_started()
+        with self._lock:
+            rooms = self._locations.get(location_unit_id)
+            if rooms is None:
+                return []
+            return rooms.suggest(normalize_room(query), limit)
+
+    def _ensure_started(self):
+        # Потоки не переживають fork, тож після нього (воркери gunicorn) запускаємо свій
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._start_lock:
+            if self._pid == pid:
+                return
+            self._thread = threading.Thread(target=self._run, name='room-index', daemon=True)
+            self._thread.start()
+            self._pid = pid
+
+    def _run(self):
+        while True:
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception('Не вдалося оновити індекс кімнат')
+            finally:
+                # Потік живе весь час процесу — не тримаємо з'єднання між оновленнями
+                close_old_connections()
+            time.sleep(settings.ROOM_INDEX_REFRESH_SECONDS)
+
+    def refresh(self):
+        now = time.monotonic()
+        if self._built_at is None or now - self._built_at >= settings.ROOM_INDEX_REBUILD_SECONDS:
+            # Нова копія будується без блокування читачів і підміняється одним присвоєнням
+            locations = {}
+            last_id = self._add_rows(locations, self._fetch_rows(0))
+            with self._lock:
+                self._locations, self._last_id = locations, last_id
+            self._built_at = now
+        else:
+            rows = list(self._fetch_rows(self._last_id))
+            with self._lock:
+                self._last_id = self._add_rows(self._locations, rows, self._last_id)
+
+    @staticmethod
+    def _fetch_rows(after_id):
+        return (
+            Request.objects.filter(id__gt=after_id)
+            .order_by('id')
+            .values_list('id', 'location_unit_id', 'room_number', 'entrance_number')
+            .iterator(chunk_size=5000)
+        )
+
+    @staticmethod
+    def _add_rows(locations, rows, last_id=0):
+        for request_id, location_unit_id, room_number, entrance_number in rows:
+            rooms = locations.get(location_unit_id)
+            if rooms is None:
+                rooms = locations[location_unit_id] = LocationRooms()
+            rooms.add(room_number, entrance_number)
+            last_id = request_id
+        return last_id
+
+
+room_index = RoomIndex()
@@ -0,0 +1,111 @@
+import hashlib
+import io
+import socket
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.core.management import call_command
+from django.db import connection
+from django.utils import timezone
+
+from core.models import JobRun
+
+
+class Job:
+    """
+    Періодична задача: management-команда, яка запускається не частіше ніж раз на `interval`.
+    """
+
+    def __init__(self, command, interval, **options):
+        self.name = command
+        self.command = command
+        self.interval = interval
+        self.options = options
+
+
+# Зареєстровані задачі. Інтервал рахується від початку попереднього запуску в будь-якому екземплярі.
+JOBS = [
+    Job('send_manager_notifications', timedelta(minutes=1)),
+    Job('send_outbox', timedelta(minutes=1)),
+    Job('complete_stale_requests', timedelta(minutes=15)),
+    Job('delete_old_requests', timedelta(days=1)),
+    Job('purge_upload_sessions', timedelta(hours=1)),
+    Job('rebuild_request_counters', timedelta(days=1)),
+    Job('prune_job_runs', timedelta(days=1)),
+]
+
+
+def advisory_lock_key(name):
+    # Стабільний знаковий 64-бітний ключ для pg_try_advisory_lock
+    return int.from_bytes(hashlib.blake2b(name.encode(), digest_size=8).digest(), 'big', signed=True)
+
+
+@contextmanager
+def advisory_lock(name):
+    """
+    Сесійний advisory lock PostgreSQL: лише один екземпляр у кластері виконує задачу.
+    Не чекає: якщо блокування зайняте, повертає False.
+    """
+    if connection.vendor != 'postgresql':
+        # Локальна розробка (SQLite) — один процес, блокування не потрібне
+        yield True
+        return
+
+    key = advisory_lock_key(name)
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_try_advisory_lock(%s)", [key])
+        acquired = cursor.fetchone()[0]
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_unlock(%s)", [key])
+
+
+def is_due(job, now):
+    last_started = (
+        JobRun.objects.filter(job_name=job.name)
+        .order_by('-started_at')
+        .values_list('started_at', flat=True)
+        .first()
+    )
+    return last_started is None or last_started + job.interval <= now
+
+
+def run_job(job):
+    run = JobRun.objects.create(job_name=job.name, started_at=timezone.now(), hostname=socket.gethostname())
+    output = io.StringIO()
+    started = time.monotonic()
+
+    try:
+        call_command(job.command, stdout=output, **job.options)
+        run.status = 'success'
+        run.message = output.getvalue()[-2000:]
+    except Exception as exc:
+        run.status = 'failed'
+        run.message = f"{type(exc).__name__}: {exc}"[:2000]
+
+    run.finished_at = timezone.now()
+    run.duration_ms = int((time.monotonic() - started) * 1000)
+    run.save(update_fields=['status', 'message', 'finished_at', 'duration_ms'])
+    return run
+
+
+def run_due_jobs(jobs=JOBS):
+    """
+    Один «тік» планувальника: запускає всі задачі, час яких настав.
+    Повертає список записів JobRun для виконаних задач.
+    """
+    runs = []
+    for job in jobs:
+        if not is_due(job, timezone.now()):
+            continue
+
+        with advisory_lock(job.name) as acquired:
+            # Перевіряємо ще раз під блокуванням: інший екземпляр міг щойно завершити задачу
+            if acquired and is_due(job, timezone.now()):
+                runs.append(run_job(job))
+
+    return runs
@@ -0,0 +1,214 @@
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.db.models import Aggregate, Count, DurationField, ExpressionWrapper, F
+from django.utils import timezone
+
+from core.models import Request, SlaMonthReport
+
+# Статуси, у яких заявка чекає на дію і може «застрягнути»
+OPEN_STATUSES = ['pending', 'approved', 'on_check']
+
+_CACHE_PREFIX = 'sla_report'
+
+
+class PercentileCont(Aggregate):
+    """
+    percentile_cont(p) WITHIN GROUP (ORDER BY ...) — неперервний перцентиль PostgreSQL.
+    """
+    function = 'percentile_cont'
+    template = '%(function)s(%(percentile)s) WITHIN GROUP (ORDER BY %(expressions)s)'
+
+    def __init__(self, expression, percentile, **extra):
+        super().__init__(expression, percentile=float(percentile), **extra)
+
+
+def month_start(moment):
+    return timezone.localtime(moment).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def previous_month(start):
+    return month_start(start - timedelta(days=1))
+
+
+def next_month(start):
+    return month_start(start + timedelta(days=32))
+
+
+def build_sla_report(months):
+    """
+    Час виконання (від created_at до completed_at) по місяцях завершення:
+    медіана та p90 у годинах для кожної пари (тип заявки, локація) і для місяця загалом.
+    Завершені місяці зберігаються в SlaMonthReport (виконані заявки з часом видаляються),
+    поточний кешується на кілька секунд — при оновленні перераховується лише він.
+    """
+    now = timezone.now()
+    current = month_start(now)
+
+    starts = [current]
+    while len(starts) < months:
+        starts.append(previous_month(starts[-1]))
+
+    key = f'{_CACHE_PREFIX}:month:{current:%Y-%m}'
+    current_bucket = cache.get(key)
+    if current_bucket is None:
+        current_bucket = _compute_month(current, next_month(current))
+        cache.set(key, current_bucket, settings.SLA_REPORT_CURRENT_TTL)
+
+    closed = starts[1:]
+    stored = dict(
+        SlaMonthReport.objects.filter(month__in=[start.date() for start in closed]).values_list('month', 'data')
+    )
+    buckets = [current_bucket]
+    for start in closed:
+        bucket = stored.get(start.date())
+        if bucket is None:
+            bucket = store_month(start)
+        buckets.append(bucket)
+
+    return {
+        "buckets": buckets,
+        "stuck": stuck_counts(),
+    }
+
+
+def store_month(start):
+    """
+    Обчислює завершений місяць і зберігає його в SlaMonthReport. Повертає дані місяця.
+    """
+    bucket = _compute_month(start, next_month(start))
+    SlaMonthReport.objects.update_or_create(month=start.date(), defaults={'data': bucket})
+    return bucket
+
+
+def store_months_before(moment):
+    """
+    Зберігає всі місяці з виконаними заявками до `moment` (початок місяця), яких ще немає
+    в SlaMonthReport. Викликається перед видаленням старих виконаних заявок.
+    """
+    months = Request.objects.filter(status='done', completed_at__lt=moment).dates('completed_at', 'month')
+    stored = set(SlaMonthReport.objects.filter(month__in=months).values_list('month', flat=True))
+    for month in months:
+        if month not in stored:
+            store_month(timezone.make_aware(datetime.combine(month, time.min)))
+
+
+def stuck_counts():
+    """
+    Кількість заявок без змін понад SLA_STUCK_DAYS днів у кожному відкритому статусі.
+    """
+    key = f'{_CACHE_PREFIX}:stuck'
+    result = cache.get(key)
+    if result is None:
+        threshold = timezone.now() - timedelta(days=settings.SLA_STUCK_DAYS)
+        counts = dict(
+            Request.objects.filter(status__in=OPEN_STATUSES, updated_at__lt=threshold)
+            .values_list('status').annotate(count=Count('id')).order_by()
+        )
+        result = {
+            "older_than_days": settings.SLA_STUCK_DAYS,
+            "counts": {status: counts.get(status, 0) for status in OPEN_STATUSES},
+        }
+        cache.set(key, result, settings.SLA_REPORT_CURRENT_TTL)
+    return result
+
+
+def _hours(duration):
+    return round(duration.total_seconds() / 3600, 2) if duration is not None else None
+
+
+def _compute_month(start, end):
+    # Індекс request_done_completed_idx: лише виконані заявки з completed_at у межах місяця
+    completed = Request.objects.filter(status='done', completed_at__gte=start, completed_at__lt=end)
+
+    if connections[completed.db].vendor == 'postgresql':
+        groups, overall = _aggregate_in_db(completed)
+    else:
+        groups, overall = _aggregate_in_python(completed)
+
+    return {
+        "month": f"{start:%Y-%m}",
+        "overall": overall,
+        "groups": groups,
+    }
+
+
+def _turnaround_stats():
+    turnaround = ExpressionWrapper(F('completed_at') - F('created_at'), output_field=DurationField())
+    return {
+        "count": Count('id'),
+        "median": PercentileCont(turnaround, 0.5, output_field=DurationField()),
+        "p90": PercentileCont(turnaround, 0.9, output_field=DurationField()),
+    }
+
+
+def _format_stats(row):
+    return {
+        "count": row['count'],
+        "median_hours": _hours(row['median']),
+        "p90_hours": _hours(row['p90']),
+    }
+
+
+def _aggregate_in_db(completed):
+    stats = _turnaround_stats()
+    rows = (
+        completed.values('type_request', 'location_unit_id', 'location_unit__name')
+        .annotate(**stats)
+        .order_by('type_request', 'location_unit_id')
+    )
+    groups = [
+        {
+            "type_request": row['type_request'],
+            "location_unit": {"id": row['location_unit_id'], "name": row['location_unit__name']},
+            **_format_stats(row),
+        }
+        for row in rows
+    ]
+    return groups, _format_stats(completed.aggregate(**stats))
+
+
+def _percentile(values, fraction):
+    # Та сама лінійна інтерполяція, що й у percentile_cont
+    if not values:
+        return None
+    position = (len(values) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+def _python_stats(durations):
+    durations.sort()
+    return {
+        "count": len(durations),
+        "median": _percentile(durations, 0.5),
+        "p90": _percentile(durations, 0.9),
+    }
+
+
+def _aggregate_in_python(completed):
+    # Запасний шлях для БД без percentile_cont (SQLite у розробці)
+    by_group = {}
+    everything = []
+    rows = completed.values_list(
+        'type_request', 'location_unit_id', 'location_unit__name', 'created_at', 'completed_at'
+    )
+    for type_request, location_unit_id, location_unit_name, created_at, completed_at in rows.iterator():
+        duration = completed_at - created_at
+        by_group.setdefault((type_request, location_unit_id, location_unit_name), []).append(duration)
+        everything.append(duration)
+
+    groups = [
+        {
+            "type_request": type_request,
+            "location_unit": {"id": location_unit_id, "name": location_unit_name},
+            **_format_stats(_python_stats(durations)),
+        }
+        for (type_request, location_unit_id, location_unit_name), durations in sorted(
+            by_group.items(), key=lambda item: (item[0][0], item[0][1])
+        )
+    ]
+    return groups, _format_stats(_python_stats(everything))
@@ -0,0 +1,14 @@
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from core.models import Request, RequestTombstone
+from core.services.request_counters import apply_counter_deltas, counter_key
+from core.services.request_sync import bulk_delete_in_progress
+
+
+@receiver(post_delete, sender=Request)
+def record_request_tombstone(sender, instance, **kwargs):
+    # Видалення поодинці (адмінка, каскад від користувача) — масові йдуть через delete_requests
+    if not bulk_delete_in_progress():
+        RequestTombstone.objects.create(request_id=instance.id, owner_id=instance.user_id)
+        apply_counter_deltas({counter_key(instance): -1})
@@ -1,3 +1,320 @@
-from django.test import TestCase
+import io
+import tempfile
+from datetime import timedelta
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connections, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from PIL import Image
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core.models import EmailOutbox, LocationUnit, Request, RequestImage, SlaMonthReport, User
+from core.services.sla_report import build_sla_report, month_start, previous_month
+from repair_requests.db_router import reset_pinning
+
+REPLICA = 'replica_1'
+
+
+@skipUnless(REPLICA in settings.DATABASES, 'Потрібна конфігурація default + replica_1 (DB_REPLICA_HOSTS, TEST.MIRROR)')
+class PrimaryReplicaRoutingTests(TransactionTestCase):
+    """
+    Репліка в тестах дзеркалить основну БД, тож дані ті самі,
+    а куди пішов запит, видно за журналом запитів кожного з'єднання.
+    TransactionTestCase: у TestCase увесь тест іде всередині atomic, і роутер
+    справедливо читав би з основної БД, а репліка не бачила б незафіксованих даних.
+    """
+    # Runner збирає databases навіть із пропущених класів — без репліки не згадуємо її
+    databases = {'default', REPLICA} if REPLICA in settings.DATABASES else {'default'}
+
+    def setUp(self):
+        self.location = LocationUnit.objects.create(
+            name='Гуртожиток 1', location_type='dormitory', street_name='Вулиця', building_number='1'
+        )
+        self.user = User.objects.create_user(email='student@example.com', role='student', first_name='А', last_name='Б')
+        self.token = Token.objects.create(user=self.user)
+        Request.objects.create(
+            user=self.user, name='Кран', type_request='plumbing', description='Тече кран',
+            location_unit=self.location, room_number='101', entrance_number='1', status='pending',
+        )
+        reset_pinning()
+        self.addCleanup(reset_pinning)
+
+    def capture(self):
+        return CaptureQueriesContext(connections['default']), CaptureQueriesContext(connections[REPLICA])
+
+    def test_reads_go_to_replica(self):
+        primary, replica = self.capture()
+        with primary, replica:
+            self.assertEqual(Request.objects.count(), 1)
+        self.assertEqual(len(primary), 0)
+        self.assertEqual(len(replica), 1)
+
+    def test_reads_inside_atomic_stay_on_primary(self):
+        primary, replica = self.capture()
+        with primary, replica, transaction.atomic():
+            Request.objects.count()
+        self.assertEqual(len(replica), 0)
+        self.assertGreater(len(primary), 0)
+
+    def test_reads_after_write_stay_on_primary(self):
+        primary, replica = self.capture()
+        with primary, replica:
+            Request.objects.filter(user=self.user).update(room_number='102')
+            Request.objects.count()
+        self.assertEqual(len(replica), 0)
+        self.assertEqual(len(primary), 2)
+
+    def test_client_is_pinned_after_write(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        client.patch('/api/profile/', {'first_name': 'В'}, format='json')
+
+        primary, replica = self.capture()
+        with primary, replica:
+            response = client.get('/api/requests/list/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(replica), 0)
+
+    def test_streamed_list_keeps_primary_pin(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        client.patch('/api/profile/', {'first_name': 'В'}, format='json')
+
+        primary, replica = self.capture()
+        with primary, replica:
+            response = client.get('/api/requests/list/?stream=1')
+            # Рядки читаються лише під час ітерації — вже після завершення middleware
+            body = b''.join(response.streaming_content)
+        self.assertIn(b'"room_number":"101"', body)
+        self.assertEqual(len(replica), 0)
+
+
+@override_settings(THROTTLE_BUCKETS={
+    'anon_ip': (5, 0.001),
+    'anon_code': (10, 0.001),
+    'anon_global': (20, 0.001),
+})
+class AnonThrottleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def verify(self, ip):
+        return self.client.post('/api/verify-code/', {'code': 'X1'}, REMOTE_ADDR=ip, content_type='application/json')
+
+    def test_flooding_ip_does_not_lock_out_others(self):
+        statuses = [self.verify('10.0.0.1').status_code for _ in range(40)]
+        self.assertEqual(statuses.count(429), 35)
+
+        # Відхилені запити не забрали токенів зі спільного відра
+        self.assertNotEqual(self.verify('10.0.0.2').status_code, 429)
+
+    def test_rejection_reports_retry_after(self):
+        for _ in range(5):
+            self.verify('10.0.0.1')
+        response = self.verify('10.0.0.1')
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+
+
+class SlaReportHistoryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.location = LocationUnit.objects.create(
+            name='Гуртожиток 1', location_type='dormitory', street_name='Вулиця', building_number='1'
+        )
+        self.user = User.objects.create_user(email='student@example.com', role='student', first_name='А', last_name='Б')
+
+    def create_done(self, completed_at, hours):
+        request_obj = Request.objects.create(
+            user=self.user, name='Кран', type_request='plumbing', description=f'Тече кран {completed_at}',
+            location_unit=self.location, room_number='101', status='done', completed_at=completed_at,
+        )
+        # created_at — auto_now_add, тож задаємо його окремим UPDATE
+        Request.objects.filter(pk=request_obj.pk).update(created_at=completed_at - timedelta(hours=hours))
+        return request_obj
+
+    def month_count(self, report, start):
+        return next(b for b in report['buckets'] if b['month'] == f'{start:%Y-%m}')['overall']['count']
+
+    def test_closed_month_survives_purge_of_done_requests(self):
+        start = previous_month(previous_month(previous_month(month_start(timezone.now()))))
+        self.create_done(start + timedelta(days=10), 5)
+        self.create_done(start + timedelta(days=11), 7)
+
+        call_command('delete_old_requests', stdout=io.StringIO())
+        self.assertFalse(Request.objects.exists())
+
+        cache.clear()
+        report = build_sla_report(4)
+        self.assertEqual(self.month_count(report, start), 2)
+
+    def test_reopening_invalidates_stored_month(self):
+        start = previous_month(month_start(timezone.now()))
+        request_obj = self.create_done(start + timedelta(days=3), 5)
+        self.assertEqual(self.month_count(build_sla_report(2), start), 1)
+        self.assertTrue(SlaMonthReport.objects.filter(month=start.date()).exists())
+
+        request_obj = Request.objects.get(pk=request_obj.pk)
+        request_obj.status = 'approved'
+        request_obj.save()
+
+        self.assertFalse(SlaMonthReport.objects.filter(month=start.date()).exists())
+        self.assertIsNone(Request.objects.get(pk=request_obj.pk).completed_at)
+        self.assertEqual(self.month_count(build_sla_report(2), start), 0)
+
+
+def mpo_upload(name='photo.jpg'):
+    # Два кадри, як у фото з телефона: основне зображення і додатковий кадр
+    buffer = io.BytesIO()
+    Image.new('RGB', (64, 48), 'red').save(
+        buffer, 'MPO', save_all=True, append_images=[Image.new('RGB', (32, 24), 'blue')]
+    )
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/jpeg')
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(), UPLOAD_SESSIONS_DIR=tempfile.mkdtemp())
+class RequestImageUploadTests(TestCase):
+    def setUp(self):
+        location = LocationUnit.objects.create(
+            name='Гуртожиток 1', location_type='dormitory', street_name='Вулиця', building_number='1'
+        )
+        self.user = User.objects.create_user(email='student@example.com', role='student', first_name='А', last_name='Б')
+        self.request_obj = Request.objects.create(
+            user=self.user, name='Кран', type_request='plumbing', description='Тече кран',
+            location_unit=location, room_number='101',
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_mpo_photo_is_accepted_as_first_frame(self):
+        response = self.client.post(
+            f'/api/requests/{self.request_obj.pk}/upload-image/', {'image': mpo_upload()}, format='multipart'
+        )
+        self.assertEqual(response.status_code, 201, response.data)
+
+        image = RequestImage.objects.get(request=self.request_obj)
+        with Image.open(image.image) as stored:
+            self.assertEqual(stored.format, 'WEBP')
+            self.assertEqual(stored.size, (64, 48))
+
+    def upload_session(self):
+        # Сесія докачування з повністю переданим файлом, ще не завершена
+        content = mpo_upload().read()
+        response = self.client.post(
+            f'/api/requests/{self.request_obj.pk}/uploads/',
+            {'filename': 'photo.jpg', 'total_size': len(content)}, format='json'
+        )
+        self.assertEqual(response.status_code, 201, response.data)
+        session_id = response.data['id']
+        response = self.client.generic(
+            'PUT', f'/api/uploads/{session_id}/', content, content_type='application/octet-stream',
+            HTTP_CONTENT_RANGE=f'bytes 0-{len(content) - 1}/{len(content)}'
+        )
+        self.assertEqual(response.status_code, 200, response.data)
+        return session_id
+
+    def test_finalize_attaches_photo(self):
+        session_id = self.upload_session()
+        response = self.client.post(f'/api/uploads/{session_id}/finalize/')
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(RequestImage.objects.filter(request=self.request_obj).count(), 1)
+
+    def test_finalize_rejected_after_request_submitted(self):
+        session_id = self.upload_session()
+        Request.objects.filter(pk=self.request_obj.pk).update(status='pending')
+
+        response = self.client.post(f'/api/uploads/{session_id}/finalize/')
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(RequestImage.objects.filter(request=self.request_obj).exists())
+
+
+class RequestListStreamTests(TestCase):
+    def setUp(self):
+        location = LocationUnit.objects.create(
+            name='Гуртожиток 1', location_type='dormitory', street_name='Вулиця', building_number='1'
+        )
+        self.student = User.objects.create_user(email='student@example.com', role='student', first_name='А', last_name='Б')
+        self.manager = User.objects.create_user(email='manager@example.com', role='manager', first_name='В', last_name='Г')
+        Request.objects.create(
+            user=self.student, name='Кран', type_request='plumbing', description='Тече\u2028кран\u2029«тут»',
+            location_unit=location, room_number='101', status='pending',
+        )
+
+    def assert_stream_matches(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        regular = client.get('/api/requests/list/').content
+        streamed = b''.join(client.get('/api/requests/list/?stream=1').streaming_content)
+        self.assertIn(b'\\u2028', regular)
+        self.assertEqual(streamed, regular)
+
+    def test_stream_matches_regular_response(self):
+        for user in (self.student, self.manager):
+            with self.subTest(role=user.role):
+                self.assert_stream_matches(user)
+
+    def test_stream_matches_regular_response_without_orjson(self):
+        with mock.patch('core.services.json_stream.orjson', None):
+            for user in (self.student, self.manager):
+                with self.subTest(role=user.role):
+                    self.assert_stream_matches(user)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class RequestDuplicatesTests(TestCase):
+    def test_drafts_and_rejected_are_not_listed(self):
+        location = LocationUnit.objects.create(
+            name='Гуртожиток 1', location_type='dormitory', street_name='Вулиця', building_number='1'
+        )
+        manager = User.objects.create_user(email='manager@example.com', role='manager', first_name='В', last_name='Г')
+        requests = {}
+        for index, status in enumerate(['pending', 'approved', 'empty', 'rejected']):
+            user = User.objects.create_user(email=f'user{index}@example.com', role='student', first_name='А', last_name='Б')
+            requests[status] = Request.objects.create(
+                user=user, name='Кран', type_request='plumbing', description=f'Тече кран {index}',
+                location_unit=location, room_number='101', status=status,
+            )
+            RequestImage.objects.create(request=requests[status], image=mpo_upload(f'photo{index}.jpg'))
+
+        client = APIClient()
+        client.force_authenticate(manager)
+        response = client.get(f'/api/requests/{requests["pending"].pk}/duplicates/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['id'] for row in response.data], [requests['approved'].pk])
+
+
+class CompleteStaleRequestsTests(TestCase):
+    def setUp(self):
+        location = LocationUnit.objects.create(
+            name='Гуртожиток 1', location_type='dormitory', street_name='Вулиця', building_number='1'
+        )
+        user = User.objects.create_user(email='student@example.com', role='student', first_name='А', last_name='Б')
+        self.request_obj = Request.objects.create(
+            user=user, name='Кран', type_request='plumbing', description='Тече кран',
+            location_unit=location, room_number='101', status='on_check', user_confirmed=True,
+        )
+
+    def completed_message(self):
+        call_command('complete_stale_requests', stdout=io.StringIO())
+        self.request_obj.refresh_from_db()
+        self.assertEqual(self.request_obj.status, 'done')
+        return EmailOutbox.objects.get(to_email='student@example.com').message
+
+    @override_settings(SUPPORT_EMAIL='')
+    def test_email_has_no_contact_line_without_support_address(self):
+        message = self.completed_message()
+        self.assertNotIn(settings.DEFAULT_FROM_EMAIL, message)
+        self.assertNotIn('зверніться', message)
+
+    @override_settings(SUPPORT_EMAIL='support@example.com')
+    def test_email_points_to_support_address(self):
+        self.assertIn('support@example.com', self.completed_message())
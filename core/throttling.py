@@ -0,0 +1,168 @@
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.cache.backends.redis import RedisCache
+from rest_framework.throttling import BaseThrottle
+
+# Локальний кеш процесу — використовується, якщо спільний кеш недоступний
+_fallback_cache = LocMemCache('throttle-fallback', {})
+
+# Для кешів у пам'яті процесу читання й запис стану відра виконуються під цим блокуванням
+_local_lock = threading.Lock()
+
+# Той самий алгоритм для Redis одним атомарним скриптом: паралельні воркери
+# не можуть прочитати однакову кількість токенів і пропустити зайві запити.
+# Час береться з Redis (TIME), тож годинники воркерів не впливають на відро.
+_REDIS_TOKEN_BUCKET = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local timeout = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'stamp')
+local tokens = tonumber(state[1]) or capacity
+local stamp = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - stamp) * rate)
+
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'stamp', tostring(now))
+redis.call('EXPIRE', KEYS[1], timeout)
+return tostring(wait)
+"""
+
+
+def take_token(key, capacity, rate):
+    """
+    Забирає один токен із відра `key` (token bucket).
+    Повертає 0, якщо запит дозволено, або кількість секунд до появи наступного токена.
+    """
+    store = caches['default']
+    try:
+        if isinstance(store, RedisCache):
+            return _take_token_redis(store, key, capacity, rate)
+        return _take_token(store, key, capacity, rate)
+    except Exception:
+        # Redis недоступний — обмежуємо хоча б у межах процесу
+        return _take_token(_fallback_cache, key, capacity, rate)
+
+
+def _take_token_redis(store, key, capacity, rate):
+    redis_key = store.make_and_validate_key(key)
+    client = store._cache.get_client(redis_key, write=True)
+    timeout = math.ceil(capacity / rate)
+    wait = client.eval(_REDIS_TOKEN_BUCKET, 1, redis_key, capacity, rate, timeout)
+    return float(wait)
+
+
+def _take_token(store, key, capacity, rate):
+    with _local_lock:
+        now = time.time()
+        tokens, stamp = store.get(key) or (capacity, now)
+
+        # Поповнюємо відро за час, що минув
+        tokens = min(capacity, tokens + (now - stamp) * rate)
+
+        # Після повного поповнення стан не потрібен — нехай кеш його видалить
+        timeout = math.ceil(capacity / rate)
+
+        if tokens >= 1:
+            store.set(key, (tokens - 1, now), timeout)
+            return 0
+
+        store.set(key, (tokens, now), timeout)
+        return (1 - tokens) / rate
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Базовий throttle на основі token bucket.
+    Параметри відра (місткість, токенів за секунду) беруться з settings.THROTTLE_BUCKETS[scope].
+    Рішення не потребує запитів до БД.
+    """
+    scope = None
+
+    def get_bucket_key(self, request, view):
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        self.wait_seconds = 0
+
+        key = self.get_bucket_key(request, view)
+        if key is None:
+            return True
+
+        capacity, rate = settings.THROTTLE_BUCKETS[self.scope]
+        self.wait_seconds = take_token(f'throttle:{self.scope}:{key}', capacity, rate)
+        return self.wait_seconds == 0
+
+    def wait(self):
+        return math.ceil(self.wait_seconds)
+
+
+class AnonIPThrottle(TokenBucketThrottle):
+    # Обмеження на одну IP-адресу
+    scope = 'anon_ip'
+
+    def get_bucket_key(self, request, view):
+        return self.get_ident(request)
+
+
+class RegistrationCodeThrottle(TokenBucketThrottle):
+    # Обмеження на один реєстраційний код (перебір кодів або повторні спроби)
+    scope = 'anon_code'
+
+    def get_bucket_key(self, request, view):
+        # Тіло може бути будь-яким JSON (масив, рядок) — тоді коду немає, а відповідь дасть серіалізатор
+        if not isinstance(request.data, dict):
+            return None
+        code = request.data.get('code')
+        if not isinstance(code, str) or not code.strip():
+            return None
+        return code.strip()
+
+
+class AnonLoadSheddingThrottle(TokenBucketThrottle):
+    """
+    Спільне відро для всіх публічних ендпоінтів у кластері.
+    При перевантаженні одразу відповідаємо 429 з Retry-After, не ставлячи роботу в чергу.
+    """
+    scope = 'anon_global'
+
+    def get_bucket_key(self, request, view):
+        return 'all'
+
+
+class AnonThrottle(BaseThrottle):
+    """
+    Відра публічних ендпоінтів по черзі: IP, код, спільне.
+    DRF опитує всі throttle зі списку навіть після першої відмови, тож окремими класами
+    відхилений запит усе одно забирав би токен зі спільного відра — і один клієнт,
+    що засипає запитами, відрізав би всіх інших. Тут перевірка зупиняється на першій відмові.
+    """
+    throttles = (AnonIPThrottle, RegistrationCodeThrottle, AnonLoadSheddingThrottle)
+
+    def allow_request(self, request, view):
+        self.wait_seconds = 0
+        for throttle_class in self.throttles:
+            throttle = throttle_class()
+            if not throttle.allow_request(request, view):
+                self.wait_seconds = throttle.wait_seconds
+                return False
+        return True
+
+    def wait(self):
+        return math.ceil(self.wait_seconds)
+
+
+ANON_THROTTLE_CLASSES = [AnonThrottle]
@@ -4,13 +4,16 @@ from rest_framework import status, serializers
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.generics import ListAPIView, get_object_or_404, CreateAPIView, DestroyAPIView
 from core.serializers import RequestCreateSerializer, RequestDetailSerializer, LoginSerializer, VerifyCodeSerializer, \
-    RegisterSerializer, RequestImageSerializer, UserProfileSerializer
-from core.models import Request, RequestImage, User
+    RegisterSerializer, RequestImageSerializer, UserProfileSerializer, UploadSessionSerializer, \
+    ClaimNextRequestSerializer
+from core.models import Request, RequestImage
 from core.permissions import IsStudentOrLecturer, IsManager, IsOwnerOrManager, IsOwner
+from core.throttling import ANON_THROTTLE_CLASSES
+from core.idempotency import idempotent
 from rest_framework.generics import RetrieveUpdateAPIView
 from rest_framework.exceptions import PermissionDenied
 from django.utils import timezone
-from core.services.request_status import can_set_done
+from core.services.request_status import can_set_done, mark_submitted
 from core.services.notifications import (
     send_status_email,
     render_request_completed_message,
@@ -18,13 +21,33 @@ from core.services.notifications import (
     render_request_approved_message,
     render_request_restored_message, render_master_assigned_message, render_user_confirmed_message
 )
+from django.db import transaction
 from django.db.models import Q
+from django.conf import settings
+from datetime import timedelta
+from django.http import Http404, StreamingHttpResponse
+from django.core.files.uploadedfile import UploadedFile
+import os
+import re
+import shutil
+from tempfile import SpooledTemporaryFile
+from rest_framework.negotiation import BaseContentNegotiation
+from core.services.media import serve_media_file
+from core.services.images import validate_image_serializers
+from core.services.fingerprints import find_similar_images
+from core.services.sla_report import build_sla_report
+from core.services.room_index import room_index
+from core.services.request_projection import iter_request_rows, parse_fields_param, columns_for_fields
+from core.services.json_stream import stream_json_array
+from core.services.request_sync import encode_cursor, decode_cursor
+from core.models import RequestTombstone, UploadSession, RequestCounter
 
 
 
 # 🔍 Ендпоінт для перевірки реєстраційного коду (без створення користувача)
 class VerifyCodeView(APIView):
     permission_classes = [AllowAny]
+    throttle_classes = ANON_THROTTLE_CLASSES
 
     def post(self, request):
         # Прив'язуємо дані запиту до VerifyCodeSerializer
@@ -45,6 +68,7 @@ class VerifyCodeView(APIView):
 #  Ендпоінт для реєстрації нового користувача
 class RegisterAPIView(APIView):
     permission_classes = [AllowAny]
+    throttle_classes = ANON_THROTTLE_CLASSES
 
     def post(self, request):
         # Передаємо POST-дані у RegisterSerializer
@@ -67,6 +91,7 @@ class RegisterAPIView(APIView):
 #  Ендпоінт для входу користувача (автентифікація)
 class LoginUserView(APIView):
     permission_classes = [AllowAny]
+    throttle_classes = ANON_THROTTLE_CLASSES
 
     def post(self, request):
         # Передаємо email та code у LoginSerializer
@@ -88,6 +113,7 @@ class LoginUserView(APIView):
 class RequestCreateView(APIView):
     permission_classes = [IsAuthenticated, IsStudentOrLecturer]
 
+    @idempotent
     def post(self, request):
         serializer = RequestCreateSerializer(data=request.data, context={'request': request})
         if serializer.is_valid():
@@ -95,14 +121,214 @@ class RequestCreateView(APIView):
             return Response({
                 "message": "Заявку створено успішно",
                 "code": new_request.code,
-                "id": new_request.id
+                "id": new_request.id,
+                "possible_duplicate_of": new_request.possible_duplicate_of_id
             }, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+class RequestComposeView(APIView):
+    """
+    Створення заявки з фото (і за бажанням відправка) одним multipart-запитом.
+    Правила валідації — ті самі серіалізатори, що й в окремих ендпоінтах.
+    """
+    permission_classes = [IsAuthenticated, IsStudentOrLecturer]
+    max_images = 5
+
+    @idempotent
+    def post(self, request):
+        files = request.FILES.getlist('image')
+        submit = str(request.data.get('submit', '')).lower() in ('1', 'true', 'yes')
+
+        # 1. Поля заявки
+        request_serializer = RequestCreateSerializer(data=request.data, context={'request': request})
+        request_serializer.is_valid(raise_exception=True)
+
+        # 2. Фото
+        if len(files) > self.max_images:
+            return Response({"error": "Можна завантажити максимум 5 зображень до заявки."}, status=400)
+
+        image_serializers = [
+            RequestImageSerializer(data={'image': file}, context={'request': request}) for file in files
+        ]
+        validate_image_serializers(image_serializers)
+
+        # 3. Умови відправки — як у SubmitRequestView
+        if submit:
+            description = request_serializer.validated_data.get('description') or ''
+            if not description.strip():
+                return Response({"error": "Поле 'Опис' є обов'язковим для відправки заявки."}, status=400)
+            if not files:
+                return Response({"error": "Необхідно додати хоча б одне зображення до заявки."}, status=400)
+
+        # 4. Усе в одній транзакції (файли без запису в БД прибере collect_orphan_media)
+        with transaction.atomic():
+            new_request = request_serializer.save()
+            for image_serializer in image_serializers:
+                image_serializer.save(request=new_request)
+            if submit:
+                mark_submitted(new_request)
+
+        return Response({
+            "message": "Заявку відправлено на перевірку" if submit else "Заявку створено успішно",
+            "code": new_request.code,
+            "id": new_request.id,
+            "status": new_request.status,
+            "possible_duplicate_of": new_request.possible_duplicate_of_id,
+            "images": [image_serializer.data for image_serializer in image_serializers],
+        }, status=status.HTTP_201_CREATED)
+
+
 class SomeManagerOnlyView(APIView):
     permission_classes = [IsAuthenticated, IsManager]
 
+
+class ClaimNextRequestView(APIView):
+    """
+    Видає менеджеру найстарішу незайняту заявку в статусі pending.
+    SELECT ... FOR UPDATE SKIP LOCKED: паралельні менеджери ніколи не отримають ту саму заявку.
+    """
+    permission_classes = [IsAuthenticated, IsManager]
+
+    def post(self, request):
+        now = timezone.now()
+        filters = ClaimNextRequestSerializer(data=request.data)
+        filters.is_valid(raise_exception=True)
+        location_unit = filters.validated_data.get("location_unit")
+        type_request = filters.validated_data.get("type_request")
+
+        with transaction.atomic():
+            qs = Request.objects.select_for_update(skip_locked=True).filter(status='pending').filter(
+                Q(claim_expires_at__isnull=True) | Q(claim_expires_at__lt=now)
+            )
+
+            # Необов'язкові фільтри черги
+            if location_unit:
+                qs = qs.filter(location_unit=location_unit)
+            if type_request:
+                qs = qs.filter(type_request=type_request)
+
+            request_obj = qs.order_by('created_at').first()
+            if request_obj is None:
+                return Response(status=status.HTTP_204_NO_CONTENT)
+
+            # Резервування на обмежений час — якщо менеджер не впорається, заявка повернеться в чергу
+            request_obj.claimed_by = request.user
+            request_obj.claim_expires_at = now + timedelta(minutes=settings.REQUEST_CLAIM_LEASE_MINUTES)
+            Request.objects.filter(pk=request_obj.pk).update(
+                claimed_by=request_obj.claimed_by,
+                claim_expires_at=request_obj.claim_expires_at,
+            )
+
+        data = RequestDetailSerializer(request_obj, context={'request': request}).data
+        return Response({**data, "claim_expires_at": request_obj.claim_expires_at}, status=status.HTTP_200_OK)
+
+class RequestDuplicatesView(APIView):
+    """
+    Для менеджера: інші заявки з такими самими (або майже такими самими) фото.
+    Пошук іде за індексами смуг перцептивного хешу, тож не залежить від кількості фото в базі.
+    """
+    permission_classes = [IsAuthenticated, IsManager]
+
+    def get(self, request, pk):
+        request_obj = get_object_or_404(Request, pk=pk)
+        phashes = RequestImage.objects.filter(request=request_obj, phash__isnull=False).values_list('phash', flat=True)
+
+        # Для кожної іншої заявки — найменша відстань між фото і кількість схожих фото
+        found = {}
+        for phash in phashes:
+            for distance, request_id, image_id in find_similar_images(phash, exclude_request_id=request_obj.id):
+                best, images = found.get(request_id, (distance, set()))
+                images.add(image_id)
+                found[request_id] = (min(best, distance), images)
+
+        # Як і в RequestListView: чернетки й відхилені заявки менеджеру не показуються
+        candidates = Request.objects.exclude(status__in=["empty", "rejected"]).select_related('location_unit')
+        requests_by_id = candidates.in_bulk(found.keys())
+        duplicates = [
+            {
+                "id": request_id,
+                "code": requests_by_id[request_id].code,
+                "name": requests_by_id[request_id].name,
+                "status": requests_by_id[request_id].status,
+                "location_unit": requests_by_id[request_id].location_unit.name,
+                "room_number": requests_by_id[request_id].room_number,
+                "created_at": requests_by_id[request_id].created_at,
+                "distance": distance,
+                "matched_images": sorted(images),
+            }
+            for request_id, (distance, images) in sorted(found.items(), key=lambda item: (item[1][0], item[0]))
+            if request_id in requests_by_id
+        ]
+
+        return Response(duplicates)
+
+
+class RequestSummaryView(APIView):
+    """
+    Панель менеджера: кількість заявок за статусами, типами та локаціями.
+    Читається з невеликої таблиці лічильників, а не з таблиці заявок.
+    """
+    permission_classes = [IsAuthenticated, IsManager]
+
+    def get(self, request):
+        by_status, by_type, by_location = {}, {}, {}
+        total = 0
+
+        counters = RequestCounter.objects.exclude(status='empty').filter(count__gt=0).values_list(
+            'location_unit_id', 'location_unit__name', 'type_request', 'status', 'count'
+        )
+        for location_unit_id, location_unit_name, type_request, status_value, count in counters:
+            total += count
+            by_status[status_value] = by_status.get(status_value, 0) + count
+            by_type[type_request] = by_type.get(type_request, 0) + count
+            location = by_location.setdefault(location_unit_id, {"id": location_unit_id, "name": location_unit_name, "count": 0})
+            location["count"] += count
+
+        return Response({
+            "total": total,
+            "by_status": by_status,
+            "by_type": by_type,
+            "by_location": sorted(by_location.values(), key=lambda location: location["id"]),
+        })
+
+
+class RoomSuggestionsView(APIView):
+    """
+    Автодоповнення номера кімнати для локації: ?q=30 -> відомі кімнати, що починаються з "30",
+    від найчастіших. Відповідь будується з індексу в пам'яті, без запиту до БД.
+    """
+    permission_classes = [IsAuthenticated]
+    max_limit = 20
+
+    def get(self, request, pk):
+        try:
+            limit = min(int(request.query_params.get('limit', 10)), self.max_limit)
+        except ValueError:
+            return Response({"error": "Параметр limit має бути числом."}, status=400)
+
+        return Response(room_index.suggest(pk, request.query_params.get('q', ''), max(limit, 1)))
+
+
+class SlaReportView(APIView):
+    """
+    Звіт для менеджерів: медіана та p90 часу виконання по місяцях, типах заявок і локаціях,
+    а також кількість заявок, що застрягли в кожному статусі. ?months=12 — скільки місяців.
+    """
+    permission_classes = [IsAuthenticated, IsManager]
+    max_months = 120
+
+    def get(self, request):
+        try:
+            months = int(request.query_params.get('months', 12))
+        except ValueError:
+            return Response({"error": "Параметр months має бути числом."}, status=400)
+        if not 1 <= months <= self.max_months:
+            return Response({"error": f"Параметр months має бути від 1 до {self.max_months}."}, status=400)
+
+        return Response(build_sla_report(months))
+
+
 class RequestListView(ListAPIView):
     serializer_class = RequestDetailSerializer
     permission_classes = [IsAuthenticated]
@@ -161,6 +387,92 @@ class RequestListView(ListAPIView):
     def get_serializer_context(self):
         return {'request': self.request}
 
+    def list(self, request, *args, **kwargs):
+        # Швидкий шлях: рядки з .values() замість RequestDetailSerializer (той самий JSON)
+        queryset = self.filter_queryset(self.get_queryset())
+        fields = parse_fields_param(request.query_params.get("fields"))
+        rows = iter_request_rows(queryset, request.user, fields=fields)
+
+        # ?stream=1 — відповідь кодується й віддається частинами, пам'ять не залежить від кількості рядків
+        if request.query_params.get("stream") in ("1", "true"):
+            return StreamingHttpResponse(stream_json_array(rows), content_type="application/json")
+
+        return Response(list(rows))
+
+
+
+class RequestChangesView(APIView):
+    """
+    Дельта-синхронізація: GET /api/requests/changes/?since=<cursor>
+    Повертає заявки, змінені після курсора, та id видалених (надгробки).
+    """
+    permission_classes = [IsAuthenticated]
+    page_size = 500
+
+    def get(self, request):
+        user = request.user
+        now = timezone.now()
+        horizon = now - timedelta(seconds=settings.SYNC_LAG_SECONDS)
+
+        if user.role in ["student", "lecturer"]:
+            qs = Request.objects.filter(user=user)
+            tombstones = RequestTombstone.objects.filter(owner_id=user.id)
+        elif user.role == "manager":
+            qs = Request.objects.all()
+            tombstones = RequestTombstone.objects.all()
+        else:
+            return Response({"detail": "Немає доступу."}, status=status.HTTP_403_FORBIDDEN)
+
+        qs = qs.filter(updated_at__lte=horizon)
+        since = request.query_params.get("since")
+        since_ts = None
+        if since:
+            since_ts, since_id = decode_cursor(since)
+
+            # Надгробки за такий давній період уже видалено — потрібна повна синхронізація
+            if since_ts < now - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS):
+                return Response({"detail": "Курсор застарів, потрібна повна синхронізація."},
+                                status=status.HTTP_410_GONE)
+
+            if since_id is None:
+                qs = qs.filter(updated_at__gt=since_ts)
+            else:
+                qs = qs.filter(Q(updated_at__gt=since_ts) | Q(updated_at=since_ts, id__gt=since_id))
+
+        page = list(qs.order_by('updated_at', 'id').values_list('id', 'updated_at', 'status')[:self.page_size + 1])
+        has_more = len(page) > self.page_size
+        page = page[:self.page_size]
+
+        if has_more:
+            until = page[-1][1]
+            cursor = encode_cursor(until, page[-1][0])
+        else:
+            until = horizon
+            cursor = encode_cursor(horizon)
+
+        # Менеджер не бачить чернеток і відхилених — для нього це те саме, що видалення
+        hidden = ["empty", "rejected"] if user.role == "manager" else []
+        changed_ids = [request_id for request_id, _, request_status in page if request_status not in hidden]
+        removed_ids = [request_id for request_id, _, request_status in page if request_status in hidden]
+
+        # Надгробки потрібні лише тим, хто вже має локальні дані
+        if since_ts is not None:
+            removed_ids += list(
+                tombstones.filter(deleted_at__gt=since_ts, deleted_at__lte=until)
+                .values_list('request_id', flat=True)
+            )
+
+        fields = parse_fields_param(request.query_params.get("fields"))
+        changed = iter_request_rows(
+            Request.objects.filter(id__in=changed_ids).order_by('updated_at', 'id'), user, fields=fields
+        )
+
+        return Response({
+            "changed": list(changed),
+            "deleted": removed_ids,
+            "cursor": cursor,
+            "has_more": has_more,
+        })
 
 
 class RequestUpdateView(RetrieveUpdateAPIView):
@@ -168,6 +480,29 @@ class RequestUpdateView(RetrieveUpdateAPIView):
     serializer_class = RequestDetailSerializer
     permission_classes = [IsAuthenticated, IsOwnerOrManager]
 
+    def get_sparse_fields(self):
+        # ?fields=... діє лише на читання
+        if self.request.method != 'GET':
+            return None
+        return parse_fields_param(self.request.query_params.get("fields"))
+
+    def get_queryset(self):
+        fields = self.get_sparse_fields()
+        if fields is None:
+            return Request.objects.all()
+
+        # Лише потрібні колонки (+ ті, що потрібні для перевірки доступу) і лише потрібні зв'язки
+        qs = Request.objects.only('user', 'status', *columns_for_fields(fields))
+        if 'location_unit' in fields:
+            qs = qs.select_related('location_unit')
+        if 'images' in fields:
+            qs = qs.prefetch_related('images')
+        return qs
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.setdefault('fields', self.get_sparse_fields())
+        return super().get_serializer(*args, **kwargs)
+
     def perform_update(self, serializer):
         request = self.request
         user = request.user
@@ -339,6 +674,7 @@ class RequestImageUploadAPIView(CreateAPIView):
 
         serializer.save(request=request_obj)
 
+    @idempotent
     def post(self, request, pk):
         req = get_object_or_404(Request, pk=pk)
 
@@ -354,17 +690,152 @@ class RequestImageUploadAPIView(CreateAPIView):
         if len(files) + RequestImage.objects.filter(request=req).count() > 5:
             return Response({"error": "Можна завантажити максимум 5 зображень до заявки."}, status=400)
 
+        image_serializers = [self.get_serializer(data={'image': file}) for file in files]
+        validate_image_serializers(image_serializers)
+
         created = []
 
-        for file in files:
-            serializer = self.get_serializer(data={'image': file})
-            serializer.is_valid(raise_exception=True)
+        for serializer in image_serializers:
             serializer.save(request=req)
             created.append(serializer.data)
 
         return Response(created, status=201)
 
 
+class UploadSessionCreateView(APIView):
+    """
+    Докачуване завантаження фото, крок 1: POST {filename, total_size} створює сесію.
+    Далі — PUT частин із заголовком Content-Range і POST .../finalize/.
+    """
+    permission_classes = [IsAuthenticated, IsOwnerOrManager]
+
+    @idempotent
+    def post(self, request, pk):
+        request_obj = get_object_or_404(Request, pk=pk)
+        self.check_object_permissions(request, request_obj)
+
+        if RequestImage.objects.filter(request=request_obj).count() >= 5:
+            return Response({"error": "Можна додати максимум 5 зображень до заявки."}, status=400)
+
+        serializer = UploadSessionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        session = serializer.save(request=request_obj, user=request.user)
+
+        # Порожній тимчасовий файл, до якого дописуються частини
+        os.makedirs(settings.UPLOAD_SESSIONS_DIR, exist_ok=True)
+        open(session.temp_path, 'wb').close()
+
+        return Response(UploadSessionSerializer(session).data, status=status.HTTP_201_CREATED)
+
+
+class UploadSessionView(APIView):
+    """
+    GET — скільки байтів уже отримано (звідки продовжувати).
+    PUT — дописати частину: тіло запиту — сирі байти, Content-Range: bytes <start>-<end>/<total>.
+    """
+    permission_classes = [IsAuthenticated]
+    content_range_re = re.compile(r'bytes (\d+)-(\d+)/(\d+)')
+    read_size = 64 * 1024
+    spool_size = 1024 * 1024  # більші частини буферизуються у тимчасовий файл
+
+    def get_session(self, request, session_id, lock=False):
+        qs = UploadSession.objects.select_for_update() if lock else UploadSession.objects
+        return get_object_or_404(qs, pk=session_id, user=request.user)
+
+    def get(self, request, session_id):
+        return Response(UploadSessionSerializer(self.get_session(request, session_id)).data)
+
+    def put(self, request, session_id):
+        match = self.content_range_re.fullmatch(request.headers.get('Content-Range', ''))
+        if not match:
+            return Response({"error": "Потрібен заголовок Content-Range: bytes <start>-<end>/<total>."}, status=400)
+        start, end, total = (int(value) for value in match.groups())
+        length = end - start + 1
+
+        session = self.get_session(request, session_id)
+        if total != session.total_size or end >= total or length <= 0:
+            return Response({"error": "Некоректний діапазон байтів."}, status=400)
+
+        # Тіло читається без відкритої транзакції: повільний клієнт не тримає блокування і з'єднання з БД
+        with SpooledTemporaryFile(max_size=self.spool_size) as chunk:
+            remaining = length
+            while remaining > 0:
+                data = request.stream.read(min(self.read_size, remaining)) if request.stream else b''
+                if not data:
+                    break
+                chunk.write(data)
+                remaining -= len(data)
+
+            if remaining:
+                return Response({"error": "Тіло запиту коротше за Content-Range.",
+                                 "received_bytes": session.received_bytes}, status=400)
+
+            # Коротке блокування лише на перевірку зсуву і дописування з локального буфера
+            with transaction.atomic():
+                session = self.get_session(request, session_id, lock=True)
+
+                # Частина не з того місця — клієнт має продовжити з received_bytes
+                if start != session.received_bytes:
+                    return Response(
+                        {"error": "Невідповідний зсув.", "received_bytes": session.received_bytes},
+                        status=status.HTTP_409_CONFLICT
+                    )
+
+                # Дописуємо в кінець без перечитування попередніх байтів.
+                # truncate відкидає хвіст частини, яку попередня спроба не встигла дописати.
+                chunk.seek(0)
+                with open(session.temp_path, 'r+b') as f:
+                    f.truncate(session.received_bytes)
+                    f.seek(session.received_bytes)
+                    shutil.copyfileobj(chunk, f, self.read_size)
+
+                session.received_bytes = end + 1
+                session.save(update_fields=['received_bytes'])
+
+        return Response(UploadSessionSerializer(session).data)
+
+
+class UploadSessionFinalizeView(APIView):
+    """
+    Останній крок: зібраний файл проходить ту саму валідацію, що й звичайне завантаження,
+    і прикріплюється до заявки як RequestImage.
+    """
+    permission_classes = [IsAuthenticated, IsOwnerOrManager]
+
+    @idempotent
+    def post(self, request, session_id):
+        # Сесія блокується: паралельний finalize дочекається і отримає 404, а не друге фото
+        with transaction.atomic():
+            session = get_object_or_404(
+                UploadSession.objects.select_for_update(), pk=session_id, user=request.user
+            )
+
+            # Заявку могли відправити, поки файл докачувався: та сама перевірка, що й при створенні
+            # сесії, під блокуванням заявки — паралельна відправка дочекається кінця транзакції
+            request_obj = get_object_or_404(Request.objects.select_for_update(), pk=session.request_id)
+            self.check_object_permissions(request, request_obj)
+
+            if session.received_bytes != session.total_size:
+                return Response({"error": "Файл завантажено не повністю.",
+                                 "received_bytes": session.received_bytes}, status=400)
+
+            if RequestImage.objects.filter(request=request_obj).count() >= 5:
+                return Response({"error": "Можна додати максимум 5 зображень до заявки."}, status=400)
+
+            with open(session.temp_path, 'rb') as f:
+                upload = UploadedFile(file=f, name=session.filename, size=session.total_size)
+                serializer = RequestImageSerializer(data={'image': upload}, context={'request': request})
+                serializer.is_valid(raise_exception=True)
+                serializer.save(request=request_obj)
+
+            temp_path = session.temp_path
+            session.delete()
+
+        os.remove(temp_path)
+
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
 class RequestImageDeleteAPIView(DestroyAPIView):
     queryset = RequestImage.objects.all()
     serializer_class = RequestImageSerializer
@@ -379,6 +850,7 @@ class RequestImageDeleteAPIView(DestroyAPIView):
 class SubmitRequestView(APIView):
     permission_classes = [IsAuthenticated]
 
+    @idempotent
     def post(self, request, pk):
         # 1. Отримати заявку або 404
         request_obj = get_object_or_404(Request, pk=pk)
@@ -403,19 +875,10 @@ class SubmitRequestView(APIView):
             return Response({"error": "Необхідно додати хоча б одне зображення до заявки."}, status=400)
 
         # 4. Зміна статусу
-        request_obj.status = 'pending'
-        request_obj.save()
-
-        # 5. Надсилання email менеджеру
-        managers = User.objects.filter(role='manager')
-        for manager in managers:
-            send_status_email(
-                to_email=manager.email,
-                subject="Нова заявка на перевірку",
-                message=f"Нова заявка на перевірку: {request_obj.code} — {request_obj.name}"
-            )
+        # Менеджерам повідомляє команда send_manager_notifications — тут жодної пошти
+        mark_submitted(request_obj)
 
-        # 6. Повернення відповіді
+        # 5. Повернення відповіді
         return Response(
             {"detail": "Заявку відправлено на перевірку"},
             status=status.HTTP_200_OK
@@ -438,4 +901,30 @@ class LogoutView(APIView):
         if hasattr(user, 'auth_token'):
             user.auth_token.delete()
 
-        return Response({"message": "Ви вийшли з системи"}, status=status.HTTP_200_OK)
\ No newline at end of file
+        return Response({"message": "Ви вийшли з системи"}, status=status.HTTP_200_OK)
+
+
+class IgnoreClientContentNegotiation(BaseContentNegotiation):
+    # Файли віддаються як є, тож заголовок Accept клієнта не перевіряємо
+    def select_parser(self, request, parsers):
+        return parsers[0]
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return renderers[0], renderers[0].media_type
+
+
+class ProtectedMediaView(APIView):
+    permission_classes = [IsAuthenticated]
+    content_negotiation_class = IgnoreClientContentNegotiation
+
+    def get(self, request, path):
+        # Файл віддається, лише якщо він належить заявці (один запит з JOIN)
+        owner_id = RequestImage.objects.filter(image=path).values_list('request__user_id', flat=True).first()
+        if owner_id is None:
+            raise Http404
+
+        # Доступ: власник заявки або менеджер
+        if request.user.role != 'manager' and owner_id != request.user.id:
+            raise PermissionDenied("Немає доступу до цього файлу.")
+
+        return serve_media_file(request, path)
@@ -0,0 +1,94 @@
+import hashlib
+import random
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Стан поточного потоку: чи потрібно читати з основної БД
+_state = threading.local()
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+def pin_to_primary():
+    # Усі наступні читання в цьому потоці підуть в основну БД
+    _state.pinned = True
+
+
+def reset_pinning():
+    _state.pinned = False
+    _state.wrote = False
+
+
+def is_pinned():
+    return getattr(_state, 'pinned', False)
+
+
+def replica_aliases():
+    return [alias for alias in settings.DATABASES if alias != DEFAULT_DB_ALIAS]
+
+
+class PrimaryReplicaRouter:
+    """
+    Читання — з випадкової репліки, запис — тільки в основну БД.
+    Після першого запису потік закріплюється за основною БД,
+    щоб не прочитати застарілі дані з репліки.
+    """
+
+    def db_for_read(self, model, **hints):
+        replicas = replica_aliases()
+        if not replicas or is_pinned():
+            return DEFAULT_DB_ALIAS
+
+        # Усередині транзакції читаємо там же, де пишемо
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        _state.wrote = True
+        pin_to_primary()
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Репліки містять ті самі дані, тож зв'язки між ними дозволені
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Міграції застосовуються лише до основної БД, репліки отримують їх через реплікацію
+        return db == DEFAULT_DB_ALIAS
+
+
+class ReadYourWritesMiddleware:
+    """
+    Після запису клієнт певний час читає з основної БД,
+    щоб студент одразу бачив щойно створену заявку.
+    Клієнт визначається за токеном (або сесією), тож БД не запитується.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        reset_pinning()
+        pin_key = self.get_pin_key(request)
+
+        if request.method not in SAFE_METHODS or (pin_key and cache.get(pin_key)):
+            pin_to_primary()
+
+        try:
+            response = self.get_response(request)
+            if pin_key and getattr(_state, 'wrote', False):
+                cache.set(pin_key, 1, settings.DB_READ_YOUR_WRITES_SECONDS)
+            return response
+        finally:
+            reset_pinning()
+
+    def get_pin_key(self, request):
+        identity = request.headers.get('Authorization') or request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+        if not identity:
+            return None
+        return 'db-pin:' + hashlib.sha256(identity.encode()).hexdigest()
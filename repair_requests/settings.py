@@ -11,7 +11,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 from pathlib import Path
-from decouple import config
+from decouple import config, Csv
 import os
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -51,6 +51,7 @@ MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
+    'repair_requests.db_router.ReadYourWritesMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
@@ -85,6 +86,21 @@ CORS_ALLOW_ALL_ORIGINS = True
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Тимчасові файли докачуваних завантажень (поза каталогом фото requests/)
+UPLOAD_SESSIONS_DIR = os.path.join(MEDIA_ROOT, 'upload_sessions')
+
+# Віддача медіа веб-сервером після перевірки доступу в Django:
+# 'nginx' — X-Accel-Redirect на internal location MEDIA_ACCEL_PREFIX, 'sendfile' — X-Sendfile (Apache),
+# порожньо — Django віддає файли сам (Range, ETag, кешування)
+MEDIA_ACCEL = config('MEDIA_ACCEL', default='')
+MEDIA_ACCEL_PREFIX = config('MEDIA_ACCEL_PREFIX', default='/protected-media/')
+
+# Нормалізація фото при завантаженні: зменшення до IMAGE_MAX_DIMENSION пікселів
+# по більшій стороні, перекодування у WebP без EXIF, кілька файлів — паралельно
+IMAGE_MAX_DIMENSION = config('IMAGE_MAX_DIMENSION', default=1600, cast=int)
+IMAGE_WEBP_QUALITY = config('IMAGE_WEBP_QUALITY', default=80, cast=int)
+IMAGE_NORMALIZE_WORKERS = config('IMAGE_NORMALIZE_WORKERS', default=4, cast=int)
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
@@ -96,6 +112,52 @@ DATABASES = {
     }
 }
 
+# Пул з'єднань (psycopg 3) або постійні з'єднання — Django не дозволяє обидва одночасно
+if config('DB_POOL', default=False, cast=bool):
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+    DATABASES['default']['OPTIONS'] = {
+        'pool': {
+            'min_size': config('DB_POOL_MIN_SIZE', default=2, cast=int),
+            'max_size': config('DB_POOL_MAX_SIZE', default=10, cast=int),
+            'timeout': config('DB_POOL_TIMEOUT', default=10, cast=int),
+        },
+    }
+else:
+    DATABASES['default']['CONN_MAX_AGE'] = config('DB_CONN_MAX_AGE', default=60, cast=int)
+    DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+
+# Репліки тільки для читання: DB_REPLICA_HOSTS=replica1:5432,replica2:5432
+# У тестах репліки дзеркалять основну БД (TEST.MIRROR)
+for index, replica in enumerate(config('DB_REPLICA_HOSTS', default='', cast=Csv()), start=1):
+    host, _, port = replica.partition(':')
+    DATABASES[f'replica_{index}'] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'PORT': port or DATABASES['default']['PORT'],
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['repair_requests.db_router.PrimaryReplicaRouter']
+
+# Скільки секунд після запису клієнт читає з основної БД
+DB_READ_YOUR_WRITES_SECONDS = config('DB_READ_YOUR_WRITES_SECONDS', default=5, cast=int)
+
+# Спільний кеш (Redis), якщо задано REDIS_URL, інакше — локальна пам'ять процесу
+REDIS_URL = config('REDIS_URL', default='')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -151,5 +213,42 @@ REST_FRAMEWORK = {
     ]
 }
 
+# Token bucket для публічних ендпоінтів: (місткість відра, токенів за секунду)
+THROTTLE_BUCKETS = {
+    'anon_ip': (20, 0.2),        # сплеск до 20 запитів з однієї IP, далі 1 запит на 5 с
+    'anon_code': (10, 1 / 60),   # 10 спроб з одним кодом, далі 1 на хвилину
+    'anon_global': (config('ANON_GLOBAL_BURST', default=300, cast=int),
+                    config('ANON_GLOBAL_RATE', default=50, cast=float)),  # межа для всього кластера
+}
+
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
-DEFAULT_FROM_EMAIL = 'noreply@yourproject.com'
\ No newline at end of file
+DEFAULT_FROM_EMAIL = 'noreply@yourproject.com'
+# Адреса для зауважень у листах, надісланих без участі менеджера; порожня — рядок не додається
+SUPPORT_EMAIL = config('SUPPORT_EMAIL', default='')
+
+# Скільки хвилин менеджер утримує заявку, взяту з черги
+REQUEST_CLAIM_LEASE_MINUTES = config('REQUEST_CLAIM_LEASE_MINUTES', default=15, cast=int)
+
+# Дельта-синхронізація: зміни, новіші за SYNC_LAG_SECONDS, віддаються наступного разу
+# (щоб не пропустити транзакції, які ще не зафіксовані), надгробки зберігаються SYNC_TOMBSTONE_RETENTION_DAYS днів
+SYNC_LAG_SECONDS = config('SYNC_LAG_SECONDS', default=5, cast=int)
+SYNC_TOMBSTONE_RETENTION_DAYS = config('SYNC_TOMBSTONE_RETENTION_DAYS', default=90, cast=int)
+
+# Журнал запусків планувальника (JobRun, ~3 тис. записів на добу) зберігається JOB_RUN_RETENTION_DAYS днів
+JOB_RUN_RETENTION_DAYS = config('JOB_RUN_RETENTION_DAYS', default=30, cast=int)
+
+# Звіт SLA: поточний місяць перераховується не частіше ніж раз на SLA_REPORT_CURRENT_TTL секунд,
+# завершені місяці зберігаються в таблиці SlaMonthReport; «застряглою» вважається заявка
+# без змін SLA_STUCK_DAYS днів
+SLA_REPORT_CURRENT_TTL = config('SLA_REPORT_CURRENT_TTL', default=60, cast=int)
+SLA_STUCK_DAYS = config('SLA_STUCK_DAYS', default=7, cast=int)
+
+# Автодоповнення номерів кімнат: індекс у пам'яті кожного процесу (фоновий потік) дочитує нові заявки
+# раз на ROOM_INDEX_REFRESH_SECONDS і повністю перебудовується раз на ROOM_INDEX_REBUILD_SECONDS
+ROOM_INDEX_REFRESH_SECONDS = config('ROOM_INDEX_REFRESH_SECONDS', default=30, cast=int)
+ROOM_INDEX_REBUILD_SECONDS = config('ROOM_INDEX_REBUILD_SECONDS', default=3600, cast=int)
+
+# Idempotency-Key: скільки секунд зберігається відповідь для повторів і скільки може тривати
+# виконання першого запиту (поки він триває, паралельні повтори отримують 409)
+IDEMPOTENCY_KEY_TTL = config('IDEMPOTENCY_KEY_TTL', default=24 * 3600, cast=int)
+IDEMPOTENCY_LOCK_SECONDS = config('IDEMPOTENCY_LOCK_SECONDS', default=60, cast=int)
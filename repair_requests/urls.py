@@ -17,10 +17,11 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path
 from django.conf import settings
-from django.conf.urls.static import static
 from core.views import RegisterAPIView, RequestCreateView, RequestListView, RequestUpdateView, RequestImageListAPIView, \
     RequestImageUploadAPIView, RequestImageDeleteAPIView, UserProfileView, LogoutView, SubmitRequestView, \
-    ConfirmRequestView
+    ConfirmRequestView, ProtectedMediaView, ClaimNextRequestView, RequestChangesView, RequestComposeView, \
+    UploadSessionCreateView, UploadSessionView, UploadSessionFinalizeView, RequestDuplicatesView, \
+    SlaReportView, RequestSummaryView, RoomSuggestionsView
 from core.views import VerifyCodeView
 from core.views import LoginUserView
 
@@ -32,16 +33,25 @@ urlpatterns = [
     path('api/register/', RegisterAPIView.as_view(), name='register'),
     path('api/login/', LoginUserView.as_view(), name='login'),
     path('api/requests/', RequestCreateView.as_view(), name='request-create'),
+    path('api/requests/compose/', RequestComposeView.as_view(), name='request-compose'),
     path('api/requests/list/', RequestListView.as_view(), name='request-list'),
+    path('api/requests/claim-next/', ClaimNextRequestView.as_view(), name='request-claim-next'),
+    path('api/requests/changes/', RequestChangesView.as_view(), name='request-changes'),
     path('api/requests/<int:pk>/', RequestUpdateView.as_view(), name='request-update'),
     path('api/requests/<int:pk>/confirm/', ConfirmRequestView.as_view(), name='request-confirm'),
     path('api/requests/<int:pk>/images/', RequestImageListAPIView.as_view(), name='request-image-list'),
     path('api/requests/<int:pk>/upload-image/', RequestImageUploadAPIView.as_view(), name='request-image-upload'),
+    path('api/requests/summary/', RequestSummaryView.as_view(), name='request-summary'),
+    path('api/locations/<int:pk>/rooms/', RoomSuggestionsView.as_view(), name='location-rooms'),
+    path('api/reports/sla/', SlaReportView.as_view(), name='sla-report'),
+    path('api/requests/<int:pk>/duplicates/', RequestDuplicatesView.as_view(), name='request-duplicates'),
+    path('api/requests/<int:pk>/uploads/', UploadSessionCreateView.as_view(), name='upload-session-create'),
+    path('api/uploads/<uuid:session_id>/', UploadSessionView.as_view(), name='upload-session'),
+    path('api/uploads/<uuid:session_id>/finalize/', UploadSessionFinalizeView.as_view(), name='upload-session-finalize'),
     path('api/request-images/<int:pk>/', RequestImageDeleteAPIView.as_view(), name='request-image-delete'),
     path('api/profile/', UserProfileView.as_view(), name="user-profile"),
     path('api/logout/', LogoutView.as_view(), name='logout'),
     path('api/requests/<int:pk>/submit/', SubmitRequestView.as_view(), name='request-submit'),
+    path(settings.MEDIA_URL.lstrip('/') + '<path:path>', ProtectedMediaView.as_view(), name='protected-media'),
 
-]
-
-urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
+]
\ No newline at end of file